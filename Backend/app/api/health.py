@@ -1,7 +1,7 @@
 """Health-check endpoint module used for liveness monitoring of the backend service."""
 
-from fastapi import APIRouter, Request
-from app.services.health_service import check_db, check_sensors
+from fastapi import APIRouter, Query, Request
+from app.services.health_service import check_db
 
 
 router = APIRouter()
@@ -14,9 +14,23 @@ def health() -> dict[str, bool]:
 
 @router.get("/health/ready")
 async def ready(request: Request) -> dict[str, bool]:
-    sampler = request.app.state.sampler
-
-    return {"db": await check_db(request.app.state.db_conn),
-            "ds18b20": check_sensors(sampler["ds18b20"].driver) if "ds18b20" in sampler else False,
-            "am2302": check_sensors(sampler["am2302"].driver) if "am2302" in sampler else False
-            }
\ No newline at end of file
+    sensors = request.app.state.sensors
+    settings = request.app.state.settings
+
+    result = {"db": await check_db(request.app.state.db_conn),
+              **{name: sensors.ready(name) for name in settings.SENSORS}
+              }
+    if settings.UPLINK_URL:
+        # Stored by the uplink, so API workers see it too; details are in the log
+        result["uplink"] = not await request.app.state.db.uplink_errors(request.app.state.db_conn)
+    return result
+
+
+@router.get("/health/storage")
+async def storage(request: Request, days: int = Query(30, ge=1, le=366)) -> dict:
+    db = request.app.state.db
+    conn = request.app.state.db_conn
+
+    # Bytes written per UTC day by the whole process (Linux I/O accounting), to track flash wear
+    return {**await db.file_stats(conn),
+            "bytes_written_per_day": await db.bytes_written_per_day(conn, days=days)}
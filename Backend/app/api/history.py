@@ -1,6 +1,9 @@
 """History endpoint that returns persisted readings filtered by absolute or relative time."""
 
 from fastapi import APIRouter, Query, Request, HTTPException
+
+from app.db import Reading
+from app.services.archive import read_window
 from app.utils.utils import parse_since
 
 router = APIRouter()
@@ -21,5 +24,9 @@ async def history(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    readings = await db.history_since(conn, since_ts=since_ts)
-    return {"readings": [reading.model_dump() for reading in readings]}
+    rows = await read_window(db, conn, request.app.state.archive, since_ts=since_ts)
+    rows.sort(key=lambda row: row[3])  # per-sensor runs are already sorted, so this is a cheap merge
+
+    return {"readings": [
+        Reading(sensor=s, temperature=t, humidity=h, ts=ts).model_dump() for (s, t, h, ts) in rows
+    ]}
@@ -0,0 +1,65 @@
+"""Bulk ingest endpoint that accepts compressed reading batches from remote sensor nodes."""
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from app.services.ingest import (
+    MAX_BATCH_SEQ,
+    BatchTooLarge,
+    IngestError,
+    decode_batch,
+    decompress,
+    validate_epoch,
+    validate_node_id,
+)
+
+router = APIRouter()
+
+
+@router.post("/ingest")
+async def ingest(
+    request: Request,
+    x_node_id: str = Header(..., description="Stable identifier of the sending node"),
+    x_batch_seq: int = Header(..., ge=0, le=MAX_BATCH_SEQ, description="Per-node, strictly increasing batch sequence number"),
+    x_node_epoch: str | None = Header(None, description="Identifies the sender's database; sequence numbers restart with a new epoch"),
+    ) -> dict:
+
+    settings = request.app.state.settings
+    collector = request.app.state.collector
+
+    try:
+        node = validate_node_id(x_node_id)
+        epoch = validate_epoch(x_node_epoch)
+        body = await _read_body(request, max_bytes=settings.INGEST_MAX_BODY_BYTES)
+        payload = decompress(body, request.headers.get("content-encoding"), max_bytes=settings.INGEST_MAX_BODY_BYTES)
+        rows = decode_batch(
+            payload,
+            request.headers.get("content-type", ""),
+            node_id=node,
+            max_rows=settings.INGEST_MAX_BATCH_READINGS,
+        )
+
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Decoding runs in this (possibly worker) process, the write goes to the process that owns the DB
+    applied, last_seq = await collector.ingest_batch(node=node, seq=x_batch_seq, rows=rows, epoch=epoch)
+
+    # A replayed batch is acknowledged again so the sender can move on after a lost response
+    return {"node": node, "seq": last_seq, "accepted": len(rows) if applied else 0, "duplicate": not applied}
+
+
+async def _read_body(request: Request, *, max_bytes: int) -> bytes:
+    # Rejected before buffering: an oversized upload must not fill the memory of a small node
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise BatchTooLarge(f"Batch body exceeds {max_bytes} bytes")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise BatchTooLarge(f"Batch body exceeds {max_bytes} bytes")
+    return bytes(body)
@@ -0,0 +1,21 @@
+"""Rolling-window endpoints that return live mean/min/max/trend aggregates per sensor."""
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.db import now_ts
+
+router = APIRouter()
+
+
+@router.get("/rolling")
+async def get_rolling(request: Request) -> dict:
+    return {"sensors": request.app.state.rolling.snapshot(now_ts())}
+
+
+@router.get("/rolling/{sensor_name}")
+async def get_rolling_sensor(sensor_name: str, request: Request) -> dict:
+    snapshot = request.app.state.rolling.snapshot(now_ts(), sensor=sensor_name)
+    if sensor_name not in snapshot:
+        raise HTTPException(status_code=404, detail=f"No rolling aggregates for sensor '{sensor_name}' yet")
+
+    return snapshot[sensor_name]
@@ -1,4 +1,4 @@
-"""Root API router that composes health, sensor, stream, and history endpoints."""
+"""Root API router that composes health, sensor, stream, rolling, history, stats, and ingest endpoints."""
 
 
 from fastapi import APIRouter
@@ -6,11 +6,17 @@ from fastapi import APIRouter
 from .health import router as health_router
 from .sensors import router as sensors_router
 from .stream import router as stream_router
+from .rolling import router as rolling_router
 from .history import router as history_router
+from .stats import router as stats_router
+from .ingest import router as ingest_router
 
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(health_router)
 api_router.include_router(sensors_router)
 api_router.include_router(stream_router)
+api_router.include_router(rolling_router)
 api_router.include_router(history_router)
+api_router.include_router(stats_router)
+api_router.include_router(ingest_router)
@@ -1,4 +1,4 @@
-"""Sensor endpoints for retrieving the latest in-memory reading per configured sensor."""
+"""Sensor endpoints for retrieving the latest reading per configured sensor."""
 
 
 from fastapi import APIRouter, HTTPException, Request
@@ -8,11 +8,11 @@ router = APIRouter()
 
 @router.get("/sensors/{sensor_name}/latest")
 async def get_latest(sensor_name: str, request: Request):
-    samplers = request.app.state.sampler
-    if sensor_name not in samplers:
+    sensors = request.app.state.sensors
+    if sensor_name not in sensors.names():
         raise HTTPException(status_code=404, detail=f"Sensor '{sensor_name}' not found")
     
-    latest = samplers[sensor_name].last_reading
+    latest = sensors.latest(sensor_name)
     if latest is None:
         raise HTTPException(status_code=404, detail=f"No readings for sensor '{sensor_name}' yet")
     
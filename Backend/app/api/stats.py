@@ -0,0 +1,62 @@
+"""Statistics endpoint that summarizes persisted readings per sensor over a time window."""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.services.archive import read_window
+from app.services.stats import DEFAULT_PERCENTILES, window_stats
+from app.utils.utils import parse_since
+
+router = APIRouter()
+
+MAX_PERCENTILES = 10
+
+
+@router.get("/stats")
+async def stats(
+    request: Request,
+    since: str = Query(default="24h", description="Unix ts or relative: 24h, 30m, now-24h"),
+    sensor: str | None = Query(default=None, description="Restrict to a single sensor"),
+    percentiles: str | None = Query(default=None, description="Comma-separated percentiles (0-100), e.g. 5,50,95"),
+    ) -> dict:
+
+    db = request.app.state.db
+    conn = request.app.state.db_conn
+    cache = request.app.state.stats_cache
+
+    try:
+        since_ts = parse_since(since)
+        wanted = _parse_percentiles(percentiles)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Keyed on the raw `since` so relative windows stay cached until the next flush or until
+    # the moving start passes the oldest cached row
+    key = (since.strip().lower(), sensor, wanted)
+    generation = await db.current_generation(conn)
+    sensors = cache.get(key, generation, since_ts)
+
+    if sensors is None:
+        # Windows reaching past retention include the archived days, like /api/history
+        rows = await read_window(db, conn, request.app.state.archive, since_ts=since_ts, sensor=sensor)
+        sensors = await asyncio.to_thread(window_stats, rows, wanted)
+        cache.put(key, generation, since_ts, sensors)
+
+    return {"since": since_ts, "sensors": sensors}
+
+
+def _parse_percentiles(value: str | None) -> tuple[float, ...]:
+    if value is None:
+        return DEFAULT_PERCENTILES
+
+    try:
+        parsed = tuple(float(p) for p in value.split(",") if p.strip())
+    except ValueError:
+        raise ValueError("Invalid percentiles. Use comma-separated numbers between 0 and 100.")
+
+    if len(parsed) > MAX_PERCENTILES or any(not 0 <= p <= 100 for p in parsed):
+        raise ValueError(f"Invalid percentiles. Use at most {MAX_PERCENTILES} numbers between 0 and 100.")
+
+    return parsed
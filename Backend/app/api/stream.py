@@ -4,6 +4,7 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 
+from app.db import now_ts
 from app.stream import SseEvent, SseHub, format_sse, sse_iterator
 
 router = APIRouter()
@@ -17,11 +18,15 @@ async def api_stream(request: Request):
     async def event_gen():
         try:
             # Send a snapshot on first subscribe
-            for sampler in request.app.state.sampler.values():
-                latest = sampler.last_reading
+            sensors = request.app.state.sensors
+            for name in sensors.names():
+                latest = sensors.latest(name)
                 if latest is not None:
                     yield format_sse(SseEvent(event="reading", data=latest.model_dump()))
 
+            for aggregates in request.app.state.rolling.snapshot(now_ts()).values():
+                yield format_sse(SseEvent(event="rolling", data=aggregates))
+
             async for chunk in sse_iterator(queue):
                 yield chunk
         finally:
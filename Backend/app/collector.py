@@ -0,0 +1,36 @@
+"""Collector process entrypoint for multi-worker deployments: sensors, writes and the event fan-out socket."""
+
+import asyncio
+import signal
+
+from app.services.collector import Collector
+from app.services.collector_link import CollectorServer
+from app.services.env_loader import get_settings
+
+
+async def main() -> None:
+    settings = get_settings()
+    if settings.DEPLOYMENT_MODE != "multi":
+        print("Warning: DEPLOYMENT_MODE is not 'multi', API workers will not use this collector")
+
+    collector = Collector(settings, publish_latest=True)
+    await collector.start()
+    server = CollectorServer(collector, settings.COLLECTOR_SOCKET_PATH)
+    await server.start()
+    print(f"Collector running, events on {settings.COLLECTOR_SOCKET_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+
+    finally:
+        await server.close()
+        await collector.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
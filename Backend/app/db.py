@@ -1,12 +1,19 @@
 """Database models and async SQLite access layer for storing and querying readings."""
 
+import asyncio
 import time
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 from pydantic import BaseModel, ConfigDict, Field
 
 import aiosqlite
 
+from app.storage import IdRow, ReadingStore, Row, RowStore
+
+
+MAX_ROW_ID = 2**63 - 1  # largest SQLite rowid
+
 
 class Reading(BaseModel):
     model_config = ConfigDict(frozen=True) # Make the model immutable
@@ -18,56 +25,342 @@ class Reading(BaseModel):
 
 
 class Database:
-    def __init__(self, path: str | Path):
+    def __init__(
+            self,
+            path: str | Path,
+            storage: ReadingStore | None = None,
+            *,
+            page_size: int = 4096,
+            cache_size_kib: int = 8192,
+            wal_autocheckpoint_pages: int = 10_000,
+            read_only: bool = False):
         self._path = str(path)
-        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        if not read_only:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self.storage: ReadingStore = storage if storage is not None else RowStore()
+        self.page_size = page_size
+        self.cache_size_kib = cache_size_kib
+        self.wal_autocheckpoint_pages = wal_autocheckpoint_pages
+        # Serializes multi-statement write transactions on the shared connection
+        self._write_lock = asyncio.Lock()
+        # Bumped whenever stored readings change; lets readers cache derived results
+        self.generation = 0
 
     async def connect(self) -> aiosqlite.Connection:
+        if self.read_only:
+            # API workers: schema, pragmas and maintenance belong to the collector that owns the file
+            db = await aiosqlite.connect(f"file:{self._path}?mode=ro", uri=True)
+            await db.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)};")
+            return db
+
         db = await aiosqlite.connect(self._path)
+        await self._apply_layout(db)
         await db.execute("PRAGMA journal_mode=WAL;")
         await db.execute("PRAGMA synchronous=NORMAL;")
+        await db.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)};")
+        # Checkpoints normally run right after each flush; the automatic one is only a safety net
+        await db.execute(f"PRAGMA wal_autocheckpoint={int(self.wal_autocheckpoint_pages)};")
+        await self.storage.setup(db)
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingest_cursors (
+              node TEXT PRIMARY KEY,
+              seq INTEGER NOT NULL,
+              ts INTEGER NOT NULL,
+              epoch TEXT
+            );
+            """
+        )
+        # Tables created before sequence epochs existed
+        await self._add_missing_columns(db, "ingest_cursors", {"epoch": "TEXT"})
+        # Marks are row ids, which only mean something for the backend that assigned them
+        await self._migrate_uplink_state(db)
         await db.execute(
             """
-            CREATE TABLE IF NOT EXISTS readings (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              sensor TEXT NOT NULL,
-              temperature REAL,
-              humidity REAL,
-              ts INTEGER NOT NULL
+            CREATE TABLE IF NOT EXISTS write_stats (
+              day TEXT PRIMARY KEY,
+              bytes INTEGER NOT NULL
             );
             """
         )
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_readings_ts ON readings(ts);")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_readings_sensor_ts ON readings(sensor, ts);")
         await db.commit()
         return db
 
+    async def _add_missing_columns(self, db: aiosqlite.Connection, table: str, columns: dict[str, str]) -> None:
+        cursor = await db.execute(f"PRAGMA table_info({table});")
+        existing = {row[1] for row in await cursor.fetchall()}
+        for name, declaration in columns.items():
+            if name not in existing:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration};")
+
+    async def _migrate_uplink_state(self, db: aiosqlite.Connection) -> None:
+        cursor = await db.execute("PRAGMA table_info(uplink_state);")
+        existing = {row[1] for row in await cursor.fetchall()}
+        legacy = bool(existing) and "backend" not in existing
+        if legacy:
+            await self._add_missing_columns(db, "uplink_state", {"epoch": "TEXT", "error": "TEXT"})
+            await db.execute("ALTER TABLE uplink_state RENAME TO uplink_state_legacy;")
+
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS uplink_state (
+              target TEXT NOT NULL,
+              backend TEXT NOT NULL,
+              last_id INTEGER NOT NULL,
+              epoch TEXT,
+              error TEXT,
+              pending_id INTEGER,
+              PRIMARY KEY (target, backend)
+            );
+            """
+        )
+        await self._add_missing_columns(db, "uplink_state", {"pending_id": "INTEGER"})
+        if legacy:
+            # Marks from before they were kept per backend belong to the backend in use now
+            await db.execute(
+                """
+                INSERT INTO uplink_state(target, backend, last_id, epoch, error)
+                SELECT target, ?, last_id, epoch, error FROM uplink_state_legacy;
+                """,
+                (self.storage.name,),
+            )
+            await db.execute("DROP TABLE uplink_state_legacy;")
+
+    async def _apply_layout(self, db: aiosqlite.Connection) -> None:
+        """Set page size and incremental auto-vacuum, rebuilding an existing file once if they differ."""
+        cursor = await db.execute(
+            "SELECT page_size, auto_vacuum, page_count FROM pragma_page_size(), pragma_auto_vacuum(), pragma_page_count();")
+        page_size, auto_vacuum, page_count = await cursor.fetchone()
+        if page_size == self.page_size and auto_vacuum == 2:  # 2 = INCREMENTAL
+            return
+
+        if page_count == 0:
+            # New file: both apply as soon as the first table is created
+            await db.execute(f"PRAGMA page_size={int(self.page_size)};")
+            await db.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+            return
+
+        # Both only take effect through VACUUM on an existing file, and the page size cannot change in WAL mode
+        print(f"Database: rebuilding {self._path} (page_size={self.page_size}, auto_vacuum=INCREMENTAL)")
+        await db.execute("PRAGMA journal_mode=DELETE;")
+        await db.execute(f"PRAGMA page_size={int(self.page_size)};")
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        await db.execute("VACUUM;")
+
     async def insert_many(self, db: aiosqlite.Connection, readings: list[Reading]) -> None:
         if not readings:
             return
-        await db.executemany(
-            "INSERT INTO readings(sensor, temperature, humidity, ts) VALUES(?, ?, ?, ?);",
-            [(r.sensor, r.temperature, r.humidity, r.ts) for r in readings],
+        async with self._write_lock:
+            await self.storage.insert_many(db, [(r.sensor, r.temperature, r.humidity, r.ts) for r in readings])
+            await db.commit()
+            self.generation += 1
+
+    async def ingest_batch(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            node: str,
+            seq: int,
+            rows: list[tuple[str, float, float | None, int]],
+            epoch: str | None = None) -> tuple[bool, int]:
+        """
+        Store a remote node's batch unless its sequence number was already acknowledged.
+        Sequence numbers are only compared within one `epoch` (the sender's database): a node
+        whose database was recreated starts a new epoch and its cursor starts over.
+
+        :return: (applied, last acknowledged sequence number for the node)
+        """
+        async with self._write_lock:
+            cursor = await db.execute("SELECT seq, epoch FROM ingest_cursors WHERE node = ?;", (node,))
+            row = await cursor.fetchone()
+            same_epoch = row is not None and (epoch is None or row[1] == epoch)
+            if same_epoch and seq <= row[0]:
+                return False, row[0]
+
+            # Rows and cursor are committed together, so a retried batch is either fully stored or not at all
+            try:
+                await self.storage.insert_many(db, rows)
+                await db.execute(
+                    "INSERT OR REPLACE INTO ingest_cursors(node, seq, ts, epoch) VALUES(?, ?, ?, ?);",
+                    (node, seq, now_ts(), epoch),
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            self.generation += 1
+            return True, seq
+
+    async def delete_older_than(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int | None = None) -> int:
+        """
+        Delete readings older than `cutoff_ts`. When `max_id` is given, rows with a larger id
+        (for example not yet pushed by the uplink) are kept regardless of age.
+        """
+        async with self._write_lock:
+            try:
+                deleted = await self.storage.delete_before(
+                    db, cutoff_ts=cutoff_ts, max_id=max_id if max_id is not None else MAX_ROW_ID)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            if deleted > 0:
+                self.generation += 1
+            return deleted
+
+    async def rows_before(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            cutoff_ts: int,
+            max_id: int | None = None) -> list[IdRow]:
+        """(id, sensor, temperature, humidity, ts) rows that `delete_older_than` with the same arguments would remove."""
+        return await self.storage.rows_before(
+            db, cutoff_ts=cutoff_ts, max_id=max_id if max_id is not None else MAX_ROW_ID)
+
+    async def readings_after(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            after_id: int,
+            limit: int,
+            max_id: int | None = None) -> list[IdRow]:
+        """
+        Return (at least) `limit` (id, sensor, temperature, humidity, ts) rows stored after `after_id`,
+        in insert order. When `max_id` is given, rows with a larger id are left out.
+        """
+        return await self.storage.rows_after(
+            db, after_id=after_id, limit=limit, max_id=max_id if max_id is not None else MAX_ROW_ID)
+
+    async def get_uplink_mark(self, db: aiosqlite.Connection, *, target: str) -> tuple[str, int, int | None]:
+        """
+        :return: (epoch, last pushed row id, last row id of the batch in flight or None) for the
+            storage backend in use. The epoch is created with the first mark of this database and
+            backend, so the receiver can tell ids that start over again (a recreated database, or
+            a switch to another backend).
+        """
+        cursor = await db.execute(
+            "SELECT epoch, last_id, pending_id FROM uplink_state WHERE target = ? AND backend = ?;",
+            (target, self.storage.name),
         )
-        await db.commit()
+        row = await cursor.fetchone()
+        if row is not None and row[0] is not None:
+            return row[0], row[1], row[2]
 
-    async def delete_older_than(self, db: aiosqlite.Connection, *, cutoff_ts: int) -> int:
-        cursor = await db.execute("DELETE FROM readings WHERE ts < ?;", (cutoff_ts,))
-        await db.commit()
-        return cursor.rowcount
+        epoch, last_id = uuid.uuid4().hex, row[1] if row is not None else 0
+        async with self._write_lock:
+            await db.execute(
+                "INSERT OR REPLACE INTO uplink_state(target, backend, last_id, epoch) VALUES(?, ?, ?, ?);",
+                (target, self.storage.name, last_id, epoch),
+            )
+            await db.commit()
+        return epoch, last_id, None
 
-    async def history_since(self, db: aiosqlite.Connection, *, since_ts: int) -> list[Reading]:
+    async def set_uplink_mark(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            target: str,
+            last_id: int,
+            pending_id: int | None = None) -> None:
+        """
+        :param last_id: Last row id the target acknowledged.
+        :param pending_id: Last row id of a batch sent but not yet acknowledged; until it is, a
+            resend covers exactly the rows up to it, so the receiver recognises it as a duplicate.
+        """
+        async with self._write_lock:
+            await db.execute(
+                "UPDATE uplink_state SET last_id = ?, pending_id = ? WHERE target = ? AND backend = ?;",
+                (last_id, pending_id, target, self.storage.name),
+            )
+            await db.commit()
+
+    async def set_uplink_error(self, db: aiosqlite.Connection, *, target: str, error: str | None) -> None:
+        """Record why the target keeps rejecting batches (None once it accepts them again)."""
+        async with self._write_lock:
+            await db.execute(
+                "UPDATE uplink_state SET error = ? WHERE target = ? AND backend = ?;",
+                (error, target, self.storage.name),
+            )
+            await db.commit()
+
+    async def uplink_errors(self, db: aiosqlite.Connection) -> dict[str, str]:
         cursor = await db.execute(
-            """
-            SELECT sensor, temperature, humidity, ts
-            FROM readings
-            WHERE ts >= ?
-            ORDER BY ts ASC;
-            """,
-            (since_ts,),
+            "SELECT target, error FROM uplink_state WHERE backend = ? AND error IS NOT NULL;",
+            (self.storage.name,),
         )
-        rows = await cursor.fetchall()
-        return [Reading(sensor=s, temperature=t, humidity=h, ts=ts) for (s, t, h, ts) in rows]
+        return dict(await cursor.fetchall())
+
+    async def current_generation(self, db: aiosqlite.Connection) -> int:
+        """`generation` for the writing process; read-only connections see other processes' commits via `data_version`."""
+        if not self.read_only:
+            return self.generation
+        cursor = await db.execute("PRAGMA data_version;")
+        (version,) = await cursor.fetchone()
+        return version
+
+    async def checkpoint(self, db: aiosqlite.Connection, *, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        """
+        Run a WAL checkpoint (`PASSIVE` never waits for readers, `TRUNCATE` also resets the WAL file).
+
+        :return: (busy, frames in the WAL, frames checkpointed)
+        """
+        cursor = await db.execute(f"PRAGMA wal_checkpoint({mode});")
+        return await cursor.fetchone()
+
+    async def incremental_vacuum(self, db: aiosqlite.Connection, *, pages: int) -> int:
+        """Return up to `pages` free pages to the filesystem; returns how many were released."""
+        async with self._write_lock:
+            before = await self._freelist_count(db)
+            # Every step of the statement releases one page; only executescript steps it to completion
+            await db.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            return before - await self._freelist_count(db)
+
+    async def file_stats(self, db: aiosqlite.Connection) -> dict[str, int]:
+        cursor = await db.execute(
+            "SELECT page_size, page_count, freelist_count FROM pragma_page_size(), pragma_page_count(), pragma_freelist_count();"
+        )
+        page_size, page_count, freelist_count = await cursor.fetchone()
+        wal_path = Path(f"{self._path}-wal")
+        return {
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_pages": freelist_count,
+            "wal_bytes": wal_path.stat().st_size if wal_path.exists() else 0,
+        }
+
+    async def add_bytes_written(self, db: aiosqlite.Connection, *, day: str, nbytes: int) -> None:
+        async with self._write_lock:
+            await db.execute(
+                "INSERT INTO write_stats(day, bytes) VALUES(?, ?) ON CONFLICT(day) DO UPDATE SET bytes = bytes + excluded.bytes;",
+                (day, nbytes),
+            )
+            await db.commit()
+
+    async def bytes_written_per_day(self, db: aiosqlite.Connection, *, days: int) -> dict[str, int]:
+        cursor = await db.execute("SELECT day, bytes FROM write_stats ORDER BY day DESC LIMIT ?;", (days,))
+        return dict(reversed(await cursor.fetchall()))
+
+    async def _freelist_count(self, db: aiosqlite.Connection) -> int:
+        cursor = await db.execute("PRAGMA freelist_count;")
+        (count,) = await cursor.fetchone()
+        return count
+
+    async def rows_since(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            since_ts: int,
+            sensor: str | None = None,
+            exclude: Sequence[tuple[int, int]] = ()) -> list[Row]:
+        """
+        Raw (sensor, temperature, humidity, ts) rows grouped by sensor and ordered by time, without building models.
+
+        :param exclude: (cutoff_ts, max_id) pairs; rows with ts < cutoff_ts and id <= max_id are left
+            out (already archived, see `ArchiveStore.read_rows`).
+        """
+        return await self.storage.range_query(db, since_ts=since_ts, sensor=sensor, exclude=exclude)
 
 
 def now_ts() -> int:
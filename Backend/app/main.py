@@ -2,7 +2,7 @@
 
 from contextlib import asynccontextmanager
 import asyncio
-from collections import deque
+import time
 # from datetime import datetime, timedelta, timezone
 
 
@@ -10,77 +10,108 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 
-from app.sensors.am2302 import AM2302
-from app.sensors.ds18b20 import DS18B20
-from app.db import Database, Reading
+from app.db import Database
+from app.storage import create_store
 from app.stream import SseHub
 
-from app.services.sampler import Sampler
-from app.services.tasks import flusher, retention
-from app.services.env_loader import settings 
+from app.services.archive import ArchiveStore
+from app.services.collector import Collector
+from app.services.collector_link import CollectorClient
+from app.services.latest import LatestTable, SamplerState
+from app.services.rolling import RollingAggregator
+from app.services.stats import StatsCache
+from app.services.env_loader import Settings, get_settings
 from app.api.router import api_router
 
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    db = Database(settings.DB_PATH)
+    settings = get_settings()
+    app.state.settings = settings
+    app.state.stats_cache = StatsCache()
+
+    if settings.DEPLOYMENT_MODE == "multi":
+        async with api_worker(app, settings):
+            yield
+    else:
+        async with single_process(app, settings):
+            yield
+
+
+@asynccontextmanager
+async def single_process(app: FastAPI, settings: Settings):
+    """Sensors, writes and the API in this one process."""
+    collector = Collector(settings)
+    await collector.start()
+
+    app.state.collector = collector
+    app.state.hub = collector.hub
+    app.state.rolling = collector.rolling
+    app.state.sensors = SamplerState(collector.samplers)
+    app.state.db_conn = collector.db_conn
+    app.state.db = collector.db
+    app.state.archive = collector.archive
+
+    try:
+        yield
+
+    finally:
+        await collector.stop()
+
+
+@asynccontextmanager
+async def api_worker(app: FastAPI, settings: Settings):
+    """
+    One of several uvicorn workers next to a separate collector process: reads go to a read-only
+    connection and the shared-memory latest-values table, live events and ingest go over the
+    collector's Unix socket.
+    """
+    latest = await _wait_for_collector(settings)
+
+    db = Database(
+        settings.DB_PATH,
+        storage=create_store(settings.STORAGE_BACKEND),
+        cache_size_kib=settings.SQLITE_CACHE_SIZE_KIB,
+        read_only=True,
+    )
     db_conn = await db.connect()
     hub = SseHub()
-    buffer: deque[Reading] = deque(maxlen=int(settings.BUFFER_MAX_READINGS))
-
-    sensor_ds18b20 = DS18B20(settings.DS18B20_DEVICE_ID)
-    sensor_am2302 = AM2302(calibration_offset=settings.AM2302_CALIBRATION_OFFSET)
-
-    def enqueue(reading: Reading) -> None:
-        # Enqueue reading to buffer
-        buffer.append(reading)
-
-    async def on_reading_change(reading: Reading) -> None:
-        enqueue(reading)
-        await hub.publish("reading", reading.model_dump())
-
-
-    samplers = [
-        Sampler(
-            driver=sensor_ds18b20,
-            sensor_name="ds18b20",
-            treshold_temp=settings.THRESHOLD_DELTA_T_HIGH,
-            interval_seconds=settings.DS18B20_SAMPLING_INTERVAL_SECONDS,
-            on_change= on_reading_change),
-        Sampler(driver=sensor_am2302,
-                sensor_name="am2302",
-                treshold_temp=settings.THRESHOLD_DELTA_T_LOW,
-                treshold_humidity=settings.THRESHOLD_DELTA_RH,
-                interval_seconds=settings.AM2302_SAMPLING_INTERVAL_SECONDS,
-                on_change=on_reading_change)
-        ]
-
-
-    tasks = [
-        asyncio.create_task(flusher(buffer, db, db_conn, settings.FLUSH_EVERY_SECONDS), name="flusher"),
-        asyncio.create_task(retention(db, db_conn, settings.RETENTION_INTERVAL_SECONDS, settings.RETENTION_HOURS), name="retention"),
-        *[asyncio.create_task(s.run(), name=f"sampler_{s.sensor_name}") for s in samplers]
-    ]
-
-    app.state.hub = hub    
-    app.state.sampler = {s.sensor_name: s for s in samplers}
+    rolling = RollingAggregator(settings.ROLLING_WINDOWS_SECONDS)
+    collector = CollectorClient(settings.COLLECTOR_SOCKET_PATH, hub=hub, rolling=rolling)
+    link = asyncio.create_task(collector.run(), name="collector_link")
+
+    app.state.collector = collector
+    app.state.hub = hub
+    app.state.rolling = rolling
+    app.state.sensors = latest
     app.state.db_conn = db_conn
     app.state.db = db
+    app.state.archive = ArchiveStore(settings.ARCHIVE_DIR, scale=settings.ARCHIVE_SCALE, read_only=True) \
+        if settings.ARCHIVE_DIR else None
 
     try:
         yield
 
     finally:
-        # Clean stop
-        for s in samplers: s.stop()
-        for t in tasks: t.cancel()
-        await asyncio.gather(*tasks, return_exceptions=True)
-
-        if buffer:
-            await db.insert_many(db_conn, list(buffer))
+        link.cancel()
+        await asyncio.gather(link, return_exceptions=True)
         await db_conn.close()
-        sensor_am2302.close()
+        latest.close()
+
+
+async def _wait_for_collector(settings: Settings) -> LatestTable:
+    # Workers usually start together with the collector, which creates the DB and the table first
+    deadline = time.monotonic() + settings.COLLECTOR_STARTUP_TIMEOUT_SECONDS
+    while True:
+        try:
+            return LatestTable.attach(settings.LATEST_SHM_NAME)
+        except FileNotFoundError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"Collector did not come up within {settings.COLLECTOR_STARTUP_TIMEOUT_SECONDS}s "
+                    "(start it with `python -m app.collector`)")
+            await asyncio.sleep(0.2)
 
 
 
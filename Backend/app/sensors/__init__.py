@@ -1 +1,17 @@
+"""Registry of sensor drivers, imported lazily so only configured hardware libraries are loaded."""
 
+import importlib
+from typing import Final
+
+
+# Sensor name -> "module:Class" of its driver.
+DRIVERS: Final[dict[str, str]] = {
+    "ds18b20": "app.sensors.ds18b20:DS18B20",
+    "am2302": "app.sensors.am2302:AM2302",
+}
+
+
+def load_driver(name: str) -> type:
+    """Import and return the driver class registered for `name`."""
+    module_name, _, class_name = DRIVERS[name].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
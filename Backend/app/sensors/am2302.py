@@ -6,9 +6,6 @@ import time
 from typing import Any
 # from datetime import datetime
 
-import adafruit_dht
-import board
-
 
 class AM2302:
     def __init__(
@@ -18,10 +15,10 @@ class AM2302:
         *,
         use_pulseio: bool = False,
     ):
-        self.pin = pin or board.D6
+        self.pin = pin
         self.calibration_offset = calibration_offset
 
-        self._dht = adafruit_dht.DHT22(self.pin, use_pulseio=use_pulseio)
+        self._dht = None
         self._lock = threading.Lock()
         # self._last_read_monotonic: float | None = None
  
@@ -31,13 +28,31 @@ class AM2302:
 
         self.hard_failed: bool = False
 
+        try:
+            # Imported here: Blinka probes the board at import time, which is slow and fails off-Pi
+            import adafruit_dht
+            import board
+
+            if self.pin is None or isinstance(self.pin, str):
+                self.pin = getattr(board, self.pin or "D6")
+            self._dht = adafruit_dht.DHT22(self.pin, use_pulseio=use_pulseio)
+
+        except Exception as e:
+            # Missing libraries or GPIO: keep running, the sensor just reports as not connected
+            print(f"AM2302 unavailable: {e}")
+            self.hard_failed = True
+
 
 
     def close(self) -> None:
-        self._dht.exit()
+        if self._dht is not None:
+            self._dht.exit()
 
 
     def read_sensor(self, *, retries: int = 2, retry_delay_seconds: float = 0.5) -> dict:
+        if self._dht is None:
+            raise RuntimeError("AM2302 driver is not available")
+
         with self._lock:
             last_error: Exception | None = None
 
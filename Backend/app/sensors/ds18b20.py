@@ -13,10 +13,24 @@ class DS18B20:
     BASE_SENSOR_PATTERN = "28-*"
 
     def __init__(self, device_id: str | None = None):
-        self.device_folder = self._sensor_is_connected(device_id)
-        self.device_file = self.device_folder / "w1_slave"
+        self.device_id = device_id
+        self.device_folder: Path | None = None
+        self.device_file: Path | None = None
         self.temperature: float | None = None
 
+        # A missing probe is not fatal: discovery is retried on every read until it shows up
+        try:
+            self._resolve_device()
+        except DS18B20NotFoundError as e:
+            print(f"DS18B20 unavailable: {e}")
+
+
+    def _resolve_device(self) -> Path:
+        if self.device_file is None:
+            self.device_folder = self._sensor_is_connected(self.device_id)
+            self.device_file = self.device_folder / "w1_slave"
+        return self.device_file
+
 
     def _sensor_is_connected(self, device_id: str | None = None) -> Path:
         """
@@ -45,7 +59,7 @@ class DS18B20:
         :return: Temperature in Celsius, or None if read failed.
         """
         self.temperature = None
-        with open(self.device_file, 'r') as f:
+        with open(self._resolve_device(), 'r') as f:
             lines = f.readlines()
 
         if len(lines) < 2: return None
@@ -62,7 +76,10 @@ class DS18B20:
 
 
     def sensor_is_connected(self) -> bool:
-        return self.device_file.exists()
+        try:
+            return self._resolve_device().exists()
+        except DS18B20NotFoundError:
+            return False
 
 
     def is_read_healthy(self) -> bool:
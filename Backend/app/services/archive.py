@@ -0,0 +1,382 @@
+"""Compressed, immutable per-day column archive for readings that expire from the live table."""
+
+import asyncio
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Final
+
+import aiosqlite
+import numpy as np
+
+from app.db import Database
+from app.storage import Row
+
+
+SECONDS_PER_DAY: Final = 86_400
+
+# File layout: MAGIC | u32 index length | JSON index | column blobs (offsets relative to the blob area).
+MAGIC: Final = b"AMA1"
+HEADER: Final = struct.Struct("<4sI")
+SUFFIX: Final = ".ama"
+
+MAX_READ_ATTEMPTS: Final = 3
+
+
+def day_of(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def day_start(day: str) -> int:
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def _encode_ints(values: np.ndarray) -> bytes:
+    """Delta + zigzag encode an int64 column, split it into byte planes and deflate it."""
+    deltas = np.diff(values.astype(np.int64), prepend=np.int64(0))
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).astype("<u8")
+    # Small deltas leave the high byte planes all zero, which deflate squeezes to almost nothing
+    planes = zigzag.view(np.uint8).reshape(-1, 8).T
+    return zlib.compress(planes.tobytes(), 9)
+
+
+def _decode_ints(blob: bytes, count: int) -> np.ndarray:
+    planes = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(8, count)
+    zigzag = np.ascontiguousarray(planes.T).view("<u8").reshape(count)
+    deltas = (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(np.int64)
+    return np.cumsum(deltas)
+
+
+class ArchiveStore:
+    """
+    Day files named `<YYYY-MM-DD>_<segment>.ama` (UTC days). Every file holds, per sensor, a
+    delta-encoded timestamp column and fixed-point (value * scale) delta-encoded value columns.
+    Files are written once and never modified; rows archived later for the same day go into a
+    new segment. A `read_only` store (API worker) rescans the directory before each read, since
+    another process writes the files. Writes and reads run in worker threads, so the in-memory
+    file list is only touched under a lock and readers work on a copy.
+    """
+
+    def __init__(self, directory: str | Path, *, scale: int = 1000, read_only: bool = False):
+        self.directory = Path(directory)
+        self.scale = scale
+        self.read_only = read_only
+        if not read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._days: dict[str, list[Path]] = {}
+        self._index_cache: dict[Path, tuple[int, dict[str, Any]]] = {}
+        self._scan()
+        if not read_only:
+            self._discard_incomplete_runs()
+
+
+    def archive(
+            self,
+            rows: list[tuple[str, float, float | None, int]],
+            *,
+            cutoff_ts: int,
+            max_id: int) -> list[Path]:
+        """
+        Write (sensor, temperature, humidity, ts) rows, grouped by sensor and ordered by time,
+        into one new segment file per UTC day they cover. One call is one run: `cutoff_ts` and
+        `max_id` are the bounds the rows were selected with (`Database.rows_before`) and identify
+        the run. Every segment records them and the run's segment count, and readers ignore a run
+        until all its segments exist. A failed run removes the segments it already wrote.
+        """
+        by_day: dict[str, list[tuple[str, float, float | None, int]]] = {}
+        for row in rows:
+            by_day.setdefault(day_of(row[3]), []).append(row)
+
+        paths: list[Path] = []
+        try:
+            for day, day_rows in sorted(by_day.items()):
+                paths.append(self._write_segment(
+                    day, day_rows, cutoff_ts=cutoff_ts, max_id=max_id, run_segments=len(by_day)))
+        except BaseException:
+            self._remove(paths)
+            raise
+        return paths
+
+
+    def archived_mark(self) -> tuple[int, int] | None:
+        """
+        (cutoff_ts, max_id) of the latest complete archive run, or None before the first one.
+        Every row with ts < cutoff_ts and id <= max_id is in the archive, so deleting them again is safe.
+        """
+        return max(self._complete_runs(self._snapshot()), default=None)
+
+
+    def runs_since(self, since_ts: int) -> list[tuple[int, int]]:
+        """(cutoff_ts, max_id) of the complete runs whose rows may reach to `since_ts` or later, oldest first."""
+        if self.read_only:
+            self._scan()
+        return sorted(run for run in self._complete_runs(self._snapshot()) if run[0] > since_ts)
+
+
+    def read_rows(
+            self,
+            since_ts: int,
+            sensor: str | None = None) -> tuple[list[tuple[str, float, float | None, int]], list[tuple[int, int]]]:
+        """
+        Archived (sensor, temperature, humidity, ts) rows with ts >= since_ts, grouped by sensor
+        and ordered by time, and `runs_since(since_ts)` for the same set of files. A run's rows stay
+        in the live table until it is complete and they are deleted, so live rows inside those runs'
+        bounds are the same readings and must be left out (`Database.rows_since(exclude=...)`).
+        """
+        if self.read_only:
+            self._scan()
+        days = self._snapshot()
+        runs = self._complete_runs(days)
+        rows: list[tuple[str, float, float | None, int]] = []
+
+        for day, segments in sorted(days.items()):
+            if day_start(day) + SECONDS_PER_DAY <= since_ts:
+                continue
+
+            for path in segments:
+                run = self._run_of(self._index_of(path))
+                if run is None or run in runs:  # segments written before runs were recorded are complete
+                    rows.extend(self._read_segment(path, since_ts, sensor))
+
+        rows.sort(key=lambda row: (row[0], row[3]))
+        return rows, sorted(run for run in runs if run[0] > since_ts)
+
+
+    def _complete_runs(self, days: dict[str, list[Path]]) -> set[tuple[int, int]]:
+        found: dict[tuple[int, int], int] = {}
+        expected: dict[tuple[int, int], int] = {}
+        for segments in days.values():
+            for index in map(self._index_of, segments):
+                run = self._run_of(index)
+                if run is not None:
+                    found[run] = found.get(run, 0) + 1
+                    expected[run] = index.get("run_segments", 1)
+        return {run for run, count in found.items() if count >= expected[run]}
+
+
+    @staticmethod
+    def _run_of(index: dict[str, Any]) -> tuple[int, int] | None:
+        return (index["cutoff_ts"], index["max_id"]) if "max_id" in index else None
+
+
+    def _discard_incomplete_runs(self) -> None:
+        # Left behind by a process that stopped in the middle of a run; their rows are still live
+        days = self._snapshot()
+        complete = self._complete_runs(days)
+        self._remove([
+            path for segments in days.values() for path in segments
+            if (run := self._run_of(self._index_of(path))) is not None and run not in complete
+        ])
+
+
+    def _remove(self, paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+            print(f"Archive: removed incomplete segment {path.name}")
+        with self._lock:
+            for path in paths:
+                self._index_cache.pop(path, None)
+            self._days = {
+                day: kept for day, segments in self._days.items()
+                if (kept := [path for path in segments if path not in paths])
+            }
+
+
+    def _scan(self) -> None:
+        days: dict[str, list[Path]] = {}
+        for path in sorted(self.directory.glob(f"*{SUFFIX}")):
+            days.setdefault(path.stem.split("_", 1)[0], []).append(path)
+        with self._lock:
+            self._days = days
+
+
+    def _snapshot(self) -> dict[str, list[Path]]:
+        with self._lock:
+            return {day: list(segments) for day, segments in self._days.items()}
+
+
+    def _write_segment(
+            self,
+            day: str,
+            rows: list[tuple[str, float, float | None, int]],
+            *,
+            cutoff_ts: int,
+            max_id: int,
+            run_segments: int) -> Path:
+        sensors, temperatures, humidities, timestamps = zip(*rows)
+        sensor_col = np.asarray(sensors)
+        temperature_col = np.asarray(temperatures, dtype=np.float64)
+        humidity_col = np.asarray(humidities, dtype=np.float64)
+        ts_col = np.asarray(timestamps, dtype=np.int64)
+
+        blobs: list[bytes] = []
+        offset = 0
+
+        def add_blob(blob: bytes) -> list[int]:
+            nonlocal offset
+            blobs.append(blob)
+            offset += len(blob)
+            return [offset - len(blob), len(blob)]
+
+        index: dict[str, Any] = {
+            "version": 1,
+            "day": day,
+            "scale": self.scale,
+            "min_ts": int(ts_col.min()),
+            "max_ts": int(ts_col.max()),
+            "cutoff_ts": cutoff_ts,
+            "max_id": max_id,
+            "run_segments": run_segments,
+            "sensors": {},
+        }
+
+        for name in dict.fromkeys(sensors):
+            mask = sensor_col == name
+            order = np.argsort(ts_col[mask], kind="stable")
+            ts = ts_col[mask][order]
+            temperature = temperature_col[mask][order]
+            humidity = humidity_col[mask][order]
+            present = ~np.isnan(humidity)
+
+            entry: dict[str, Any] = {
+                "count": int(ts.size),
+                "first_ts": int(ts[0]),
+                "last_ts": int(ts[-1]),
+                "ts": add_blob(_encode_ints(ts)),
+                "temperature": add_blob(_encode_ints(np.round(temperature * self.scale))),
+                "humidity": None,
+                "humidity_mask": None,
+            }
+            if present.any():
+                entry["humidity"] = add_blob(_encode_ints(np.round(humidity[present] * self.scale)))
+                if not present.all():
+                    entry["humidity_mask"] = add_blob(zlib.compress(np.packbits(present).tobytes(), 9))
+
+            index["sensors"][str(name)] = entry
+
+        index_bytes = json.dumps(index, separators=(",", ":")).encode()
+
+        with self._lock:
+            # Numbers of removed segments may be missing, so continue after the highest one
+            segment = 1 + max((int(path.stem.split("_", 1)[1]) for path in self._days.get(day, [])), default=-1)
+        path = self.directory / f"{day}_{segment:03d}{SUFFIX}"
+        tmp_path = path.with_suffix(".tmp")
+
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(index_bytes)))
+            f.write(index_bytes)
+            for blob in blobs:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._days.setdefault(day, []).append(path)
+        return path
+
+
+    def _read_segment(
+            self,
+            path: Path,
+            since_ts: int,
+            sensor: str | None = None) -> list[tuple[str, float, float | None, int]]:
+        rows: list[tuple[str, float, float | None, int]] = []
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data_start, index = self._load_index(path, mm)
+            if index["max_ts"] < since_ts:
+                return rows
+
+            scale = index["scale"]
+
+            def blob(ref: list[int]) -> bytes:
+                return mm[data_start + ref[0]:data_start + ref[0] + ref[1]]
+
+            for name, entry in index["sensors"].items():
+                if entry["last_ts"] < since_ts or sensor not in (None, name):
+                    continue
+
+                count = entry["count"]
+                ts = _decode_ints(blob(entry["ts"]), count)
+                start = int(np.searchsorted(ts, since_ts, side="left"))
+                temperature = _decode_ints(blob(entry["temperature"]), count) / scale
+
+                humidity: list[float | None] = [None] * count
+                if entry["humidity"] is not None:
+                    if entry["humidity_mask"] is not None:
+                        present = np.unpackbits(
+                            np.frombuffer(zlib.decompress(blob(entry["humidity_mask"])), dtype=np.uint8),
+                            count=count,
+                        ).astype(bool)
+                    else:
+                        present = np.ones(count, dtype=bool)
+                    values = np.full(count, np.nan)
+                    values[present] = _decode_ints(blob(entry["humidity"]), int(present.sum())) / scale
+                    humidity = [None if np.isnan(v) else v for v in values.tolist()]
+
+                rows.extend(zip(
+                    [name] * (count - start),
+                    temperature[start:].tolist(),
+                    humidity[start:],
+                    ts[start:].tolist(),
+                ))
+
+        return rows
+
+
+    def _index_of(self, path: Path) -> dict[str, Any]:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return self._load_index(path, mm)[1]
+
+
+    def _load_index(self, path: Path, mm: mmap.mmap) -> tuple[int, dict[str, Any]]:
+        with self._lock:
+            cached = self._index_cache.get(path)
+        if cached is not None:
+            return cached
+
+        magic, index_length = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an AirMetrics archive file: {path}")
+
+        data_start = HEADER.size + index_length
+        index = json.loads(mm[HEADER.size:data_start])
+        with self._lock:
+            self._index_cache[path] = (data_start, index)
+        return data_start, index
+
+
+async def read_window(
+        db: Database,
+        db_conn: aiosqlite.Connection,
+        archive: ArchiveStore | None,
+        *,
+        since_ts: int,
+        sensor: str | None = None) -> list[Row]:
+    """
+    Live and archived (sensor, temperature, humidity, ts) rows with ts >= since_ts, grouped by
+    sensor and ordered by time, with every reading exactly once: live rows of complete archive
+    runs are left out even before retention deletes them.
+    """
+    if archive is None:
+        return await db.rows_since(db_conn, since_ts=since_ts, sensor=sensor)
+
+    for _ in range(MAX_READ_ATTEMPTS):
+        archived, runs = await asyncio.to_thread(archive.read_rows, since_ts, sensor)
+        live = await db.rows_since(db_conn, since_ts=since_ts, sensor=sensor, exclude=runs)
+        # A run that completed in between may have deleted live rows that `archived` does not have
+        if await asyncio.to_thread(archive.runs_since, since_ts) == runs:
+            break
+
+    rows = archived + live
+    rows.sort(key=lambda row: (row[0], row[3]))
+    return rows
@@ -0,0 +1,177 @@
+"""Collector that owns the sensor drivers, the write connection and every background task that writes."""
+
+import asyncio
+from collections import deque
+
+import aiosqlite
+
+from app.db import Database, Reading
+from app.storage import create_store
+from app.stream import SseHub
+
+from app.services.archive import ArchiveStore
+from app.services.drivers import build_samplers, close_drivers
+from app.services.env_loader import Settings
+from app.services.health_service import check_sensors
+from app.services.latest import LatestTable
+from app.services.maintenance import Maintenance
+from app.services.rolling import RollingAggregator
+from app.services.sampler import Sampler
+from app.services.tasks import flusher, retention
+from app.services.uplink import Uplink
+
+
+class Collector:
+    """
+    Samples the sensors, buffers and flushes readings, and runs retention, maintenance and the uplink.
+    In single-process mode it lives inside the API process; in multi-worker mode it runs alone
+    (`python -m app.collector`) and additionally publishes the latest values to a shared-memory table.
+    """
+
+    STATUS_INTERVAL_SECONDS = 2.0
+
+    def __init__(self, settings: Settings, *, publish_latest: bool = False):
+        self.settings = settings
+        self.publish_latest = publish_latest
+        self.latest: LatestTable | None = None
+
+        self.db = Database(
+            settings.DB_PATH,
+            storage=create_store(settings.STORAGE_BACKEND),
+            page_size=settings.SQLITE_PAGE_SIZE,
+            cache_size_kib=settings.SQLITE_CACHE_SIZE_KIB,
+            wal_autocheckpoint_pages=settings.SQLITE_WAL_AUTOCHECKPOINT_PAGES,
+        )
+        self.db_conn: aiosqlite.Connection | None = None
+        self.hub = SseHub()
+        self.rolling = RollingAggregator(settings.ROLLING_WINDOWS_SECONDS)
+        self.archive = ArchiveStore(settings.ARCHIVE_DIR, scale=settings.ARCHIVE_SCALE) if settings.ARCHIVE_DIR else None
+
+        # Readings still inside the longest rolling window, replayed to API workers when they connect
+        self.recent: deque[Reading] = deque()
+
+        self.samplers: dict[str, Sampler] = {}
+        self.uplink: Uplink | None = None
+        self.maintenance: Maintenance | None = None
+
+        self._buffer: deque[Reading] = deque(maxlen=int(settings.BUFFER_MAX_READINGS))
+        self._tasks: list[asyncio.Task] = []
+
+
+    async def start(self) -> None:
+        settings = self.settings
+        db, db_conn = self.db, await self.db.connect()
+        self.db_conn = db_conn
+        if self.publish_latest:
+            # Created after the schema, API workers wait for the table before opening the DB
+            self.latest = LatestTable.create(settings.LATEST_SHM_NAME, settings.SENSORS)
+
+        self.samplers = {s.sensor_name: s for s in build_samplers(settings, self._on_reading_change)}
+
+        if settings.UPLINK_URL:
+            self.uplink = Uplink(
+                db=db,
+                db_conn=db_conn,
+                url=settings.UPLINK_URL,
+                node_id=settings.UPLINK_NODE_ID,
+                batch_readings=settings.UPLINK_BATCH_READINGS,
+                timeout_seconds=settings.UPLINK_TIMEOUT_SECONDS,
+                backoff_initial_seconds=settings.UPLINK_BACKOFF_INITIAL_SECONDS,
+                backoff_max_seconds=settings.UPLINK_BACKOFF_MAX_SECONDS,
+            )
+        uplink = self.uplink
+
+        self.maintenance = maintenance = Maintenance(
+            db=db,
+            db_conn=db_conn,
+            checkpoint_mode=settings.SQLITE_CHECKPOINT_MODE,
+            vacuum_step_pages=settings.SQLITE_VACUUM_STEP_PAGES,
+            vacuum_max_steps=settings.SQLITE_VACUUM_MAX_STEPS,
+        )
+
+        def after_flush() -> None:
+            maintenance.notify_flush()
+            if uplink:
+                uplink.notify()
+
+        self._tasks = [
+            asyncio.create_task(flusher(self._buffer, db, db_conn, settings.FLUSH_EVERY_SECONDS,
+                                        on_flush=after_flush), name="flusher"),
+            asyncio.create_task(retention(db, db_conn, settings.RETENTION_INTERVAL_SECONDS, settings.RETENTION_HOURS,
+                                          # Unpushed readings outlive retention until the uplink catches up
+                                          keep_after_id=(lambda: uplink.high_water_mark or 0) if uplink else None,
+                                          archive=self.archive,
+                                          on_delete=maintenance.notify_retention), name="retention"),
+            asyncio.create_task(maintenance.run(), name="maintenance"),
+            *[asyncio.create_task(s.run(), name=f"sampler_{name}") for name, s in self.samplers.items()]
+        ]
+        if uplink:
+            self._tasks.append(asyncio.create_task(uplink.run(), name="uplink"))
+        if self.latest is not None:
+            self._tasks.append(asyncio.create_task(self._publish_status(), name="latest_status"))
+
+
+    async def stop(self) -> None:
+        # Clean stop
+        for s in self.samplers.values(): s.stop()
+        for t in self._tasks: t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        # The uplink is stopped by now; anything flushed here is pushed on the next start
+        if self._buffer:
+            await self.db.insert_many(self.db_conn, list(self._buffer))
+        await self.maintenance.record_writes()
+        await self.db_conn.close()
+        close_drivers(list(self.samplers.values()))
+        if self.latest is not None:
+            self.latest.close()
+
+
+    async def ingest_batch(
+            self,
+            *,
+            node: str,
+            seq: int,
+            rows: list[tuple[str, float, float | None, int]],
+            epoch: str | None = None) -> tuple[bool, int]:
+        """Store a remote node's batch (see `Database.ingest_batch`) and schedule a checkpoint."""
+        applied, last_seq = await self.db.ingest_batch(self.db_conn, node=node, seq=seq, rows=rows, epoch=epoch)
+        if applied:
+            self.maintenance.notify_flush()
+        return applied, last_seq
+
+
+    async def _on_reading_change(self, reading: Reading) -> None:
+        # Enqueue reading to buffer
+        self._buffer.append(reading)
+        self._remember(reading)
+        if self.latest is not None:
+            self.latest.publish(reading)
+
+        await self.hub.publish("reading", reading.model_dump())
+        await self.hub.publish("rolling", self.rolling.add(reading))
+
+
+    def _remember(self, reading: Reading) -> None:
+        self.recent.append(reading)
+        horizon = reading.ts - max(self.rolling.windows_seconds)
+        while self.recent[0].ts < horizon:
+            self.recent.popleft()
+
+
+    async def _publish_status(self) -> None:
+        # Readiness of each sensor plus a heartbeat, so API workers notice a collector that is gone
+        while True:
+            try:
+                for name in self.settings.SENSORS:
+                    sampler = self.samplers.get(name)
+                    self.latest.set_ready(name, check_sensors(sampler.driver) if sampler else False)
+                self.latest.heartbeat()
+                await asyncio.sleep(self.STATUS_INTERVAL_SECONDS)
+
+            except asyncio.CancelledError:
+                break
+
+            except Exception as e:
+                print(f"Status publisher error: {e}")
+                await asyncio.sleep(self.STATUS_INTERVAL_SECONDS)
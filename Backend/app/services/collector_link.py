@@ -0,0 +1,182 @@
+"""Local Unix-socket link between the collector and API workers: SSE event fan-out and forwarded ingest batches."""
+
+import asyncio
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Final
+
+from app.db import Reading
+from app.services.collector import Collector
+from app.services.ingest import IngestRow
+from app.services.rolling import RollingAggregator
+from app.stream import SseHub
+
+
+# Every message is a length-prefixed JSON object.
+FRAME_HEADER: Final = struct.Struct(">I")
+MAX_FRAME_BYTES: Final = 256 * 1024 * 1024
+
+RECONNECT_DELAY_SECONDS: Final = 1.0
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict[str, Any]) -> None:
+    payload = json.dumps(message, separators=(",", ":")).encode()
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader) -> dict[str, Any]:
+    (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return json.loads(await reader.readexactly(length))
+
+
+class CollectorServer:
+    """
+    Runs in the collector process. A connection either subscribes to the event stream (first the
+    readings still inside the rolling windows, marked as replay, then every live event of the
+    collector's SseHub) or sends one ingest batch and waits for the acknowledgement.
+    """
+
+    def __init__(self, collector: Collector, path: str | Path):
+        self.collector = collector
+        self.path = Path(path)
+        self._server: asyncio.Server | None = None
+        self._connections: set[asyncio.Task] = set()
+
+
+    async def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)  # left over from a previous run
+        self._server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        os.chmod(self.path, 0o660)
+
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Subscriptions never end on their own
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self.path.unlink(missing_ok=True)
+
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            request = await _receive(reader)
+            op = request.get("op")
+            if op == "subscribe":
+                await self._stream(writer)
+            elif op == "ingest":
+                await self._ingest(request, writer)
+            else:
+                await _send(writer, {"error": f"Unknown op: {op}"})
+
+        except asyncio.CancelledError:
+            pass  # collector shutting down
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # worker went away
+
+        except Exception as e:
+            print(f"Collector link error: {e}")
+
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        hub = self.collector.hub
+        queue = await hub.subscribe()
+        try:
+            for reading in list(self.collector.recent):
+                await _send(writer, {"event": "reading", "data": reading.model_dump(), "replay": True})
+
+            while True:
+                event = await queue.get()
+                await _send(writer, {"event": event.event, "data": event.data})
+        finally:
+            await hub.unsubscribe(queue)
+
+
+    async def _ingest(self, request: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        try:
+            applied, last_seq = await self.collector.ingest_batch(
+                node=request["node"],
+                seq=request["seq"],
+                rows=[tuple(row) for row in request["rows"]],
+                epoch=request.get("epoch"),
+            )
+        except Exception as e:
+            await _send(writer, {"error": str(e)})
+            return
+
+        await _send(writer, {"applied": applied, "seq": last_seq})
+
+
+class CollectorClient:
+    """
+    Runs in each API worker. `run()` keeps a subscription to the collector open, feeds the worker's
+    own RollingAggregator and republishes live events to the worker's SseHub; `ingest_batch` forwards
+    a decoded batch to the collector, which owns all writes.
+    """
+
+    def __init__(self, path: str | Path, *, hub: SseHub, rolling: RollingAggregator):
+        self.path = str(path)
+        self.hub = hub
+        self.rolling = rolling
+
+
+    async def run(self) -> None:
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                try:
+                    await _send(writer, {"op": "subscribe"})
+                    # The collector replays the rolling windows on every (re)connect
+                    self.rolling.clear()
+
+                    while True:
+                        message = await _receive(reader)
+                        if message["event"] == "reading":
+                            self.rolling.add(Reading(**message["data"]))
+                        if not message.get("replay"):
+                            await self.hub.publish(message["event"], message["data"])
+                finally:
+                    writer.close()
+
+            except asyncio.CancelledError:
+                break
+
+            except Exception as e:
+                print(f"Collector link lost ({e or type(e).__name__}), reconnecting")
+                try:
+                    await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                except asyncio.CancelledError:
+                    break
+
+
+    async def ingest_batch(
+            self,
+            *,
+            node: str,
+            seq: int,
+            rows: list[IngestRow],
+            epoch: str | None = None) -> tuple[bool, int]:
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        try:
+            await _send(writer, {"op": "ingest", "node": node, "seq": seq, "rows": rows, "epoch": epoch})
+            reply = await _receive(reader)
+        finally:
+            writer.close()
+
+        if "error" in reply:
+            raise RuntimeError(f"Collector rejected ingest batch: {reply['error']}")
+        return reply["applied"], reply["seq"]
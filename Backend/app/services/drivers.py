@@ -0,0 +1,58 @@
+"""Builds one Sampler per configured sensor, loading each driver module only when it is enabled."""
+
+from typing import Awaitable, Callable
+
+from app.db import Reading
+from app.sensors import load_driver
+from app.services.env_loader import Settings
+from app.services.sampler import Sampler
+
+
+def _ds18b20(driver_cls: type, settings: Settings, on_change: Callable[[Reading], Awaitable[None]]) -> Sampler:
+    return Sampler(
+        driver=driver_cls(settings.DS18B20_DEVICE_ID),
+        sensor_name="ds18b20",
+        treshold_temp=settings.THRESHOLD_DELTA_T_HIGH,
+        interval_seconds=settings.DS18B20_SAMPLING_INTERVAL_SECONDS,
+        on_change=on_change,
+    )
+
+
+def _am2302(driver_cls: type, settings: Settings, on_change: Callable[[Reading], Awaitable[None]]) -> Sampler:
+    return Sampler(
+        driver=driver_cls(pin=settings.AM2302_PIN, calibration_offset=settings.AM2302_CALIBRATION_OFFSET),
+        sensor_name="am2302",
+        treshold_temp=settings.THRESHOLD_DELTA_T_LOW,
+        treshold_humidity=settings.THRESHOLD_DELTA_RH,
+        interval_seconds=settings.AM2302_SAMPLING_INTERVAL_SECONDS,
+        on_change=on_change,
+    )
+
+
+SAMPLER_FACTORIES: dict[str, Callable[..., Sampler]] = {
+    "ds18b20": _ds18b20,
+    "am2302": _am2302,
+}
+
+
+def build_samplers(settings: Settings, on_change: Callable[[Reading], Awaitable[None]]) -> list[Sampler]:
+    """
+    Create samplers for `settings.SENSORS`. A driver that cannot be loaded is skipped and the
+    sensor reports as not ready, instead of aborting the whole startup.
+    """
+    samplers: list[Sampler] = []
+
+    for name in settings.SENSORS:
+        try:
+            samplers.append(SAMPLER_FACTORIES[name](load_driver(name), settings, on_change))
+        except Exception as e:
+            print(f"Sensor {name} disabled: {e}")
+
+    return samplers
+
+
+def close_drivers(samplers: list[Sampler]) -> None:
+    for sampler in samplers:
+        close = getattr(sampler.driver, "close", None)
+        if close is not None:
+            close()
@@ -2,10 +2,14 @@
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Annotated, Literal
 
-from pydantic import Field, ValidationError, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, ValidationError, field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+from app.sensors import DRIVERS
 
 
 class Settings(BaseSettings):
@@ -15,9 +19,13 @@ class Settings(BaseSettings):
     """
     
     # --- Sensor settings ---
-    DS18B20_DEVICE_ID: str = Field(
-        ...,
-        description="Linux 1-wire device identifier for the DS18B20 temperature sensor (for example: 28-xxxxxxxxxxxx).",
+    SENSORS: Annotated[list[str], NoDecode] = Field(
+        ["ds18b20", "am2302"],
+        description="Comma-separated sensor drivers to load. Only these driver modules are imported.",
+    )
+    DS18B20_DEVICE_ID: str | None = Field(
+        None,
+        description="Linux 1-wire device identifier for the DS18B20 temperature sensor (for example: 28-xxxxxxxxxxxx). Empty means the first probe found.",
         min_length=1,
     )
     DS18B20_SAMPLING_INTERVAL_SECONDS: float = Field(
@@ -25,6 +33,11 @@ class Settings(BaseSettings):
         description="Polling interval in seconds for DS18B20 reads.",
     )
     
+    AM2302_PIN: str = Field(
+        "D6",
+        description="Blinka `board` pin name the AM2302 data line is connected to.",
+        min_length=1,
+    )
     AM2302_CALIBRATION_OFFSET: float = Field(
         1.0,
         description="Calibration offset applied to AM2302 temperature measurements.",
@@ -41,6 +54,41 @@ class Settings(BaseSettings):
         min_length=1,
     )
 
+    STORAGE_BACKEND: Literal["rows", "gorilla"] = Field(
+        "rows",
+        description="Reading storage layout: one SQLite row per reading ('rows') or compressed per-sensor blocks ('gorilla').",
+    )
+
+    # --- SQLite tuning and maintenance ---
+    SQLITE_PAGE_SIZE: int = Field(
+        4096,
+        description="SQLite page size in bytes (power of two, 512-65536). Changing it rebuilds an existing database file once at startup.",
+    )
+    SQLITE_CACHE_SIZE_KIB: int = Field(
+        8192,
+        description="SQLite page cache size per connection in KiB.",
+        gt=0,
+    )
+    SQLITE_WAL_AUTOCHECKPOINT_PAGES: int = Field(
+        10_000,
+        description="WAL size in pages at which SQLite checkpoints on its own (0 disables). Checkpoints normally run right after each flush.",
+        ge=0,
+    )
+    SQLITE_CHECKPOINT_MODE: Literal["PASSIVE", "TRUNCATE"] = Field(
+        "PASSIVE",
+        description="Checkpoint mode after flushes: PASSIVE never waits for readers, TRUNCATE also resets the WAL file to zero bytes.",
+    )
+    SQLITE_VACUUM_STEP_PAGES: int = Field(
+        256,
+        description="Pages released per incremental_vacuum step after retention.",
+        gt=0,
+    )
+    SQLITE_VACUUM_MAX_STEPS: int = Field(
+        64,
+        description="Maximum incremental_vacuum steps per retention run; remaining free pages are released after the next run.",
+        gt=0,
+    )
+
     # --- Sampling logic ---
     THRESHOLD_DELTA_T_HIGH: float = Field(
         0.125,
@@ -79,6 +127,88 @@ class Settings(BaseSettings):
         description="Maximum age of stored readings in hours before they are deleted by retention cleanup.",
     )
 
+    # --- Cold archive ---
+    ARCHIVE_DIR: str | None = Field(
+        None,
+        description="Directory for compressed per-day archive files of expired readings. Empty deletes expired readings instead.",
+    )
+    ARCHIVE_SCALE: int = Field(
+        1000,
+        description="Fixed-point scale for archived values (1000 keeps three decimals).",
+        gt=0,
+    )
+
+    # --- Rolling aggregates ---
+    ROLLING_WINDOWS_SECONDS: Annotated[list[int], NoDecode] = Field(
+        [60, 300, 900],
+        description="Comma-separated rolling window lengths in seconds for live mean/min/max/trend aggregates.",
+        min_length=1,
+    )
+
+    # --- Remote ingest ---
+    INGEST_MAX_BODY_BYTES: int = Field(
+        4 * 1024 * 1024,
+        description="Maximum size in bytes of an ingest batch body, both as received and after decompression.",
+        gt=0,
+    )
+    INGEST_MAX_BATCH_READINGS: int = Field(
+        50_000,
+        description="Maximum number of readings accepted in a single ingest batch.",
+        gt=0,
+    )
+
+    # --- Uplink (store-and-forward to a central instance) ---
+    UPLINK_URL: str | None = Field(
+        None,
+        description="Base URL of the central AirMetrics instance (for example: http://central:8000). Empty disables the uplink.",
+    )
+    UPLINK_NODE_ID: str | None = Field(
+        None,
+        description="Identifier this node reports to the central instance. Required when UPLINK_URL is set.",
+        pattern=r"^[A-Za-z0-9_-]{1,32}$",
+    )
+    UPLINK_BATCH_READINGS: int = Field(
+        5_000,
+        description="Maximum number of readings pushed in a single uplink batch.",
+        gt=0,
+    )
+    UPLINK_TIMEOUT_SECONDS: float = Field(
+        10.0,
+        description="HTTP timeout in seconds for a single uplink push.",
+        gt=0,
+    )
+    UPLINK_BACKOFF_INITIAL_SECONDS: float = Field(
+        2.0,
+        description="First retry delay in seconds after a failed push; doubled after every further failure.",
+        gt=0,
+    )
+    UPLINK_BACKOFF_MAX_SECONDS: float = Field(
+        300.0,
+        description="Upper bound in seconds for the uplink retry delay.",
+        gt=0,
+    )
+
+    # --- Deployment ---
+    DEPLOYMENT_MODE: Literal["single", "multi"] = Field(
+        "single",
+        description="'single': one process samples, writes and serves the API. 'multi': `python -m app.collector` owns sensors and writes, uvicorn workers serve the API read-only.",
+    )
+    COLLECTOR_SOCKET_PATH: str = Field(
+        "/tmp/airmetrics-collector.sock",
+        description="Unix socket the collector fans out live events on and receives forwarded ingest batches from (multi mode).",
+        min_length=1,
+    )
+    LATEST_SHM_NAME: str = Field(
+        "airmetrics-latest",
+        description="Name of the shared-memory table holding the latest reading per sensor (multi mode).",
+        pattern=r"^[A-Za-z0-9_.-]{1,64}$",
+    )
+    COLLECTOR_STARTUP_TIMEOUT_SECONDS: float = Field(
+        30.0,
+        description="How long an API worker waits at startup for the collector to come up (multi mode).",
+        gt=0,
+    )
+
     # --- Pydantic configuration ---
     model_config = SettingsConfigDict(       
         env_file=os.path.join(os.path.dirname(__file__), '../../airmetrics.env'),
@@ -108,21 +238,62 @@ class Settings(BaseSettings):
 
         return db_path
 
+    @field_validator('SQLITE_PAGE_SIZE')
+    @classmethod
+    def check_page_size(cls, page_size: int) -> int:
+        if not 512 <= page_size <= 65536 or page_size & (page_size - 1):
+            raise ValueError("SQLite page size must be a power of two between 512 and 65536")
+        return page_size
+
+    @field_validator('SENSORS', 'ROLLING_WINDOWS_SECONDS', mode='before')
+    @classmethod
+    def split_comma_separated(cls, value: object) -> object:
+        if isinstance(value, str):
+            return [part.strip() for part in value.split(",") if part.strip()]
+        return value
+
+    @field_validator('SENSORS')
+    @classmethod
+    def check_sensor_drivers(cls, sensors: list[str]) -> list[str]:
+        if unknown := [name for name in sensors if name not in DRIVERS]:
+            raise ValueError(f"Unknown sensor driver(s): {', '.join(unknown)}. Available: {', '.join(DRIVERS)}")
+        return sensors
+
+    @field_validator('ROLLING_WINDOWS_SECONDS')
+    @classmethod
+    def check_rolling_windows(cls, windows: list[int]) -> list[int]:
+        if any(seconds <= 0 for seconds in windows):
+            raise ValueError("Rolling windows must be positive numbers of seconds")
+        return windows
+
+    @model_validator(mode='after')
+    def check_uplink_node_id(self) -> 'Settings':
+        if self.UPLINK_URL and not self.UPLINK_NODE_ID:
+            raise ValueError("UPLINK_NODE_ID is required when UPLINK_URL is set")
+        return self
 
-try:
-    # Try to load and validate the configuration
-    settings = Settings()
-    print("Config loaded successfully")
 
-except ValidationError as e:
-    print("Critical configuration error:")
-    # print detailed validation errors
-    for error in e.errors():
-        loc = error['loc'][0]
-        msg = error['msg']
-        print(f"   - {loc}: {msg}")
-    sys.exit(1)
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load and validate the configuration on first use (at application startup, not at import time).
+    Exits the process with a readable error report if the configuration is invalid.
+    """
+    try:
+        # Try to load and validate the configuration
+        settings = Settings()
+        print("Config loaded successfully")
+        return settings
+
+    except ValidationError as e:
+        print("Critical configuration error:")
+        # print detailed validation errors
+        for error in e.errors():
+            loc = error['loc'][0] if error['loc'] else "config"
+            msg = error['msg']
+            print(f"   - {loc}: {msg}")
+        sys.exit(1)
 
-except Exception as e:
-    print(f"Unexpected system error: {e}")
-    sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected system error: {e}")
+        sys.exit(1)
@@ -0,0 +1,179 @@
+"""Decoding and one-pass validation of reading batches pushed by remote sensor nodes."""
+
+import json
+import math
+import re
+import struct
+import zlib
+from typing import Final
+
+
+# (sensor, temperature, humidity, ts) — same column order as the readings table.
+IngestRow = tuple[str, float, float | None, int]
+
+NDJSON_MEDIA_TYPE: Final = "application/x-ndjson"
+PACKED_MEDIA_TYPE: Final = "application/vnd.airmetrics.packed"
+
+# Packed record: sensor name (ASCII, NUL padded), temperature, humidity (NaN = missing), unix ts.
+PACKED_RECORD: Final = struct.Struct("<16sddq")
+
+NODE_ID_PATTERN: Final = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+SENSOR_NAME_PATTERN: Final = re.compile(r"^[A-Za-z0-9_.-]{1,16}$")
+EPOCH_PATTERN: Final = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Batch sequence numbers are the sender's row ids, stored as SQLite INTEGER.
+MAX_BATCH_SEQ: Final = 2**63 - 1
+
+
+class IngestError(ValueError):
+    pass
+
+
+class BatchTooLarge(IngestError):
+    """The batch exceeds a size limit; the sender can retry with smaller batches."""
+
+
+def validate_node_id(node_id: str) -> str:
+    if not NODE_ID_PATTERN.match(node_id):
+        raise IngestError("Invalid node id. Use 1-32 characters of [A-Za-z0-9_-].")
+    return node_id
+
+
+def validate_epoch(epoch: str | None) -> str | None:
+    if epoch is not None and not EPOCH_PATTERN.match(epoch):
+        raise IngestError("Invalid node epoch. Use 1-64 characters of [A-Za-z0-9_-].")
+    return epoch
+
+
+def decompress(body: bytes, content_encoding: str | None, *, max_bytes: int) -> bytes:
+    """
+    Undo the transfer compression of a batch body, refusing to inflate past `max_bytes`.
+    """
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+
+    if encoding != "gzip":
+        raise IngestError(f"Unsupported Content-Encoding: {content_encoding}")
+
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        payload = inflater.decompress(body, max_bytes)
+    except zlib.error as e:
+        raise IngestError(f"Corrupt gzip body: {e}") from e
+
+    if inflater.unconsumed_tail:
+        raise BatchTooLarge(f"Decompressed batch exceeds {max_bytes} bytes")
+    if not inflater.eof:
+        raise IngestError("Truncated gzip body")
+
+    return payload
+
+
+def decode_batch(payload: bytes, media_type: str, *, node_id: str, max_rows: int) -> list[IngestRow]:
+    """
+    Decode a batch into insertable rows. Sensor names are namespaced as `<node_id>:<sensor>`
+    so identical sensors on different nodes do not collide.
+    """
+    media_type = media_type.split(";", 1)[0].strip().lower()
+
+    if media_type == NDJSON_MEDIA_TYPE:
+        rows = _decode_ndjson(payload, max_rows=max_rows)
+    elif media_type == PACKED_MEDIA_TYPE:
+        rows = _decode_packed(payload, max_rows=max_rows)
+    else:
+        raise IngestError(f"Unsupported Content-Type: {media_type or 'missing'}")
+
+    return [(f"{node_id}:{sensor}", temperature, humidity, ts) for (sensor, temperature, humidity, ts) in rows]
+
+
+def encode_ndjson(rows: list[IngestRow]) -> bytes:
+    """Inverse of the NDJSON decoder, used by the uplink to push local readings."""
+    return b"".join(
+        json.dumps(
+            {"sensor": sensor, "temperature": temperature, "humidity": humidity, "ts": ts},
+            separators=(",", ":"),
+        ).encode() + b"\n"
+        for (sensor, temperature, humidity, ts) in rows
+    )
+
+
+def encode_packed(rows: list[IngestRow]) -> bytes:
+    """Inverse of the packed decoder, for senders written in Python."""
+    return b"".join(
+        PACKED_RECORD.pack(sensor.encode("ascii"), temperature, math.nan if humidity is None else humidity, ts)
+        for (sensor, temperature, humidity, ts) in rows
+    )
+
+
+def _decode_ndjson(payload: bytes, *, max_rows: int) -> list[IngestRow]:
+    lines = [line for line in payload.splitlines() if line.strip()]
+    _check_row_count(len(lines), max_rows)
+
+    # Parse the whole batch with a single json.loads call instead of one call per line.
+    try:
+        records = json.loads(b"[" + b",".join(lines) + b"]")
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise IngestError(f"Malformed NDJSON batch: {e}") from e
+
+    if len(records) != len(lines):
+        raise IngestError("Malformed NDJSON batch: expected exactly one JSON object per line")
+
+    rows: list[IngestRow] = []
+    for line_no, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            raise IngestError(f"Line {line_no}: expected a JSON object")
+
+        rows.append(_check_row(
+            line_no,
+            record.get("sensor"),
+            record.get("temperature"),
+            record.get("humidity"),
+            record.get("ts"),
+        ))
+
+    return rows
+
+
+def _decode_packed(payload: bytes, *, max_rows: int) -> list[IngestRow]:
+    if len(payload) % PACKED_RECORD.size:
+        raise IngestError(f"Packed batch length must be a multiple of {PACKED_RECORD.size} bytes")
+    _check_row_count(len(payload) // PACKED_RECORD.size, max_rows)
+
+    rows: list[IngestRow] = []
+    for record_no, (raw_name, temperature, humidity, ts) in enumerate(PACKED_RECORD.iter_unpack(payload), start=1):
+        try:
+            sensor = raw_name.rstrip(b"\0").decode("ascii")
+        except UnicodeDecodeError:
+            raise IngestError(f"Record {record_no}: sensor name is not ASCII")
+
+        rows.append(_check_row(record_no, sensor, temperature, None if math.isnan(humidity) else humidity, ts))
+
+    return rows
+
+
+def _check_row_count(count: int, max_rows: int) -> None:
+    if count == 0:
+        raise IngestError("Empty batch")
+    if count > max_rows:
+        raise BatchTooLarge(f"Batch has {count} readings, the limit is {max_rows}")
+
+
+def _check_row(position: int, sensor, temperature, humidity, ts) -> IngestRow:
+    if not isinstance(sensor, str) or not SENSOR_NAME_PATTERN.match(sensor):
+        raise IngestError(f"Row {position}: invalid sensor name")
+
+    if not _is_finite_number(temperature):
+        raise IngestError(f"Row {position}: temperature must be a finite number")
+
+    if humidity is not None and not _is_finite_number(humidity):
+        raise IngestError(f"Row {position}: humidity must be a finite number or null")
+
+    if isinstance(ts, bool) or not isinstance(ts, int) or ts <= 0:
+        raise IngestError(f"Row {position}: ts must be a positive unix timestamp")
+
+    return (sensor, float(temperature), None if humidity is None else float(humidity), ts)
+
+
+def _is_finite_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
@@ -0,0 +1,197 @@
+"""Latest reading and readiness per sensor, in process (samplers) or in a shared-memory table for API workers."""
+
+import math
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Final, Protocol
+
+from app.db import Reading
+from app.services.health_service import check_sensors
+from app.services.sampler import Sampler
+
+
+# Table layout: MAGIC | u32 slot count | i64 heartbeat (ms) | slots.
+MAGIC: Final = b"AML1"
+HEADER: Final = struct.Struct("<4sIq")
+# Slot: u64 sequence (odd while being written) | fields. Sensor names are fixed when the table is created.
+SEQ: Final = struct.Struct("<Q")
+SLOT: Final = struct.Struct("<32sddqBB6x")
+
+MAX_READ_ATTEMPTS: Final = 10_000
+STALE_AFTER_SECONDS: Final = 10.0  # collector heartbeat age after which sensors report as not ready
+
+
+class SensorState(Protocol):
+    def names(self) -> list[str]: ...
+
+    def latest(self, sensor: str) -> Reading | None: ...
+
+    def ready(self, sensor: str) -> bool: ...
+
+
+class SamplerState:
+    """SensorState read directly from the samplers, used when the API runs in the collector process."""
+
+    def __init__(self, samplers: dict[str, Sampler]):
+        self._samplers = samplers
+
+    def names(self) -> list[str]:
+        return list(self._samplers)
+
+    def latest(self, sensor: str) -> Reading | None:
+        sampler = self._samplers.get(sensor)
+        return sampler.last_reading if sampler else None
+
+    def ready(self, sensor: str) -> bool:
+        # Configured sensors whose driver failed to load are reported as not ready
+        sampler = self._samplers.get(sensor)
+        return check_sensors(sampler.driver) if sampler else False
+
+
+class LatestTable:
+    """
+    Fixed table in shared memory with one slot per sensor, written only by the collector and read
+    by any number of API worker processes without locks: each slot is guarded by a sequence
+    counter (seqlock) that is odd while the writer updates it, and readers retry on a change.
+    """
+
+    def __init__(self, shm: SharedMemory):
+        self._shm = shm
+
+        magic, count, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory '{shm.name}' is not an AirMetrics latest-values table")
+
+        self._slots: dict[str, int] = {}
+        for i in range(count):
+            offset = HEADER.size + i * (SEQ.size + SLOT.size)
+            name = SLOT.unpack_from(shm.buf, offset + SEQ.size)[0].rstrip(b"\0").decode()
+            self._slots[name] = offset
+
+
+    @classmethod
+    def create(cls, name: str, sensors: list[str]) -> "LatestTable":
+        """
+        Create the table for `sensors`, or reuse the one left by a previous collector run if it has
+        the same sensors, so API workers that are already attached keep seeing updates.
+        """
+        try:
+            existing = cls(_open_shm(name))
+            if existing.names() == sensors:
+                for offset in existing._slots.values():
+                    # A collector killed in the middle of an update leaves an odd sequence behind
+                    (seq,) = SEQ.unpack_from(existing._shm.buf, offset)
+                    SEQ.pack_into(existing._shm.buf, offset, seq + (seq & 1))
+                return existing
+            existing._shm.close()
+            print(f"Latest-values table '{name}' has different sensors, recreating it (restart the API workers)")
+            SharedMemory(name=name).unlink()
+        except FileNotFoundError:
+            pass
+
+        shm = _open_shm(name, size=HEADER.size + len(sensors) * (SEQ.size + SLOT.size))
+        HEADER.pack_into(shm.buf, 0, MAGIC, len(sensors), 0)
+        for i, sensor in enumerate(sensors):
+            offset = HEADER.size + i * (SEQ.size + SLOT.size)
+            SEQ.pack_into(shm.buf, offset, 0)
+            SLOT.pack_into(shm.buf, offset + SEQ.size, sensor.encode(), math.nan, math.nan, 0, 0, 0)
+
+        return cls(shm)
+
+
+    @classmethod
+    def attach(cls, name: str) -> "LatestTable":
+        """Open the collector's table; raises FileNotFoundError while the collector is not up."""
+        return cls(_open_shm(name))
+
+
+    def close(self) -> None:
+        # The segment is never unlinked: it outlives collector restarts, attached workers keep working
+        self._shm.close()
+
+
+    def names(self) -> list[str]:
+        return list(self._slots)
+
+
+    def publish(self, reading: Reading) -> None:
+        offset = self._slots.get(reading.sensor)
+        if offset is None:
+            return
+
+        _, _, _, _, _, ready = self._read_slot(offset)
+        humidity = math.nan if reading.humidity is None else reading.humidity
+        self._write_slot(offset, reading.sensor, reading.temperature, humidity, reading.ts, 1, ready)
+
+
+    def set_ready(self, sensor: str, ready: bool) -> None:
+        offset = self._slots.get(sensor)
+        if offset is None:
+            return
+
+        name, temperature, humidity, ts, has_reading, _ = self._read_slot(offset)
+        self._write_slot(offset, name, temperature, humidity, ts, has_reading, int(ready))
+
+
+    def heartbeat(self) -> None:
+        struct.pack_into("<q", self._shm.buf, 8, int(time.time() * 1000))
+
+
+    def latest(self, sensor: str) -> Reading | None:
+        offset = self._slots.get(sensor)
+        if offset is None:
+            return None
+
+        name, temperature, humidity, ts, has_reading, _ = self._read_slot(offset)
+        if not has_reading:
+            return None
+        return Reading(sensor=name, temperature=temperature, humidity=None if math.isnan(humidity) else humidity, ts=ts)
+
+
+    def ready(self, sensor: str) -> bool:
+        offset = self._slots.get(sensor)
+        if offset is None or not self.collector_alive():
+            return False
+        return bool(self._read_slot(offset)[5])
+
+
+    def collector_alive(self) -> bool:
+        (heartbeat_ms,) = struct.unpack_from("<q", self._shm.buf, 8)
+        return time.time() - heartbeat_ms / 1000 <= STALE_AFTER_SECONDS
+
+
+    def _write_slot(self, offset: int, name: str, temperature: float, humidity: float, ts: int, has_reading: int, ready: int) -> None:
+        # Single writer: bump to odd, write the fields, bump to the next even value
+        (seq,) = SEQ.unpack_from(self._shm.buf, offset)
+        SEQ.pack_into(self._shm.buf, offset, seq + 1)
+        SLOT.pack_into(self._shm.buf, offset + SEQ.size, name.encode(), temperature, humidity, ts, has_reading, ready)
+        SEQ.pack_into(self._shm.buf, offset, seq + 2)
+
+
+    def _read_slot(self, offset: int) -> tuple[str, float, float, int, int, int]:
+        buf = self._shm.buf
+        for _ in range(MAX_READ_ATTEMPTS):
+            (before,) = SEQ.unpack_from(buf, offset)
+            if before & 1:
+                continue  # writer is in the middle of an update
+            name, temperature, humidity, ts, has_reading, ready = SLOT.unpack_from(buf, offset + SEQ.size)
+            (after,) = SEQ.unpack_from(buf, offset)
+            if before == after:
+                return name.rstrip(b"\0").decode(), temperature, humidity, ts, has_reading, ready
+
+        # Only possible if the collector died in the middle of an update
+        raise RuntimeError("Latest-values slot is stuck in an update")
+
+
+def _open_shm(name: str, *, size: int = 0) -> SharedMemory:
+    """Attach to (size 0) or create a segment without handing it to the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, create=size > 0, size=size, track=False)
+
+    shm = SharedMemory(name=name, create=size > 0, size=size)
+    # Before 3.13 every process using the segment would unlink it at exit, pulling it from under the others
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
@@ -0,0 +1,114 @@
+"""SQLite maintenance: WAL checkpoints after flushes, bounded incremental vacuum after retention, write accounting."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import aiosqlite
+
+from app.db import Database
+from app.services.archive import day_of
+
+
+PROC_IO_PATH = Path("/proc/self/io")
+
+
+def process_bytes_written() -> int | None:
+    """Bytes this process caused to be written to storage (Linux task I/O accounting), or None if unavailable."""
+    try:
+        fields = dict(line.split(": ", 1) for line in PROC_IO_PATH.read_text().splitlines())
+        # Data truncated from the page cache before it reached the disk was never written
+        return int(fields["write_bytes"]) - int(fields.get("cancelled_write_bytes", 0))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class Maintenance:
+    """
+    Runs checkpoints at known moments (right after a flush or ingest batch) instead of whenever the
+    WAL grows past SQLite's automatic threshold, releases pages freed by retention in small
+    `incremental_vacuum` steps, and accumulates the bytes written by the process per UTC day.
+    """
+
+    def __init__(
+        self,
+        *,
+        db: Database,
+        db_conn: aiosqlite.Connection,
+        checkpoint_mode: str = "PASSIVE",
+        vacuum_step_pages: int = 256,
+        vacuum_max_steps: int = 64,
+    ):
+        self.db = db
+        self.db_conn = db_conn
+        self.checkpoint_mode = checkpoint_mode
+        self.vacuum_step_pages = vacuum_step_pages
+        self.vacuum_max_steps = vacuum_max_steps
+
+        self._checkpoint_pending = False
+        self._vacuum_pending = False
+        self._wake = asyncio.Event()
+        self._last_written = process_bytes_written()
+
+
+    def notify_flush(self) -> None:
+        """Request a checkpoint, called after new readings were committed."""
+        self._checkpoint_pending = True
+        self._wake.set()
+
+
+    def notify_retention(self) -> None:
+        """Request an incremental vacuum, called after retention deleted readings."""
+        self._vacuum_pending = True
+        self._wake.set()
+
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._wake.wait()
+                self._wake.clear()
+
+                mode = self.checkpoint_mode
+                if self._vacuum_pending:
+                    self._vacuum_pending = False
+                    await self._vacuum()
+                    mode = "TRUNCATE"  # the vacuum steps grew the WAL, give that space back too
+
+                if self._checkpoint_pending or mode == "TRUNCATE":
+                    self._checkpoint_pending = False
+                    # Recorded first, so the stats row is part of the checkpoint
+                    await self.record_writes()
+                    await self.db.checkpoint(self.db_conn, mode=mode)
+
+            except asyncio.CancelledError:
+                break
+
+            except Exception as e:
+                print(f"Maintenance error: {e}")
+
+
+    async def record_writes(self) -> None:
+        """Add the bytes written since the previous call to today's `write_stats` row."""
+        written = process_bytes_written()
+        if written is None or self._last_written is None:
+            return
+
+        delta, self._last_written = written - self._last_written, written
+        if delta > 0:
+            await self.db.add_bytes_written(self.db_conn, day=day_of(int(time.time())), nbytes=delta)
+
+
+    async def _vacuum(self) -> None:
+        released = 0
+        # Bounded per run: pages still free afterwards are released after the next retention run
+        for _ in range(self.vacuum_max_steps):
+            step = await self.db.incremental_vacuum(self.db_conn, pages=self.vacuum_step_pages)
+            released += step
+            if step < self.vacuum_step_pages:
+                break
+            # Let flushes and queries run between steps
+            await asyncio.sleep(0)
+
+        if released:
+            print(f"Maintenance: released {released} free pages.")
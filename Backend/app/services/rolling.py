@@ -0,0 +1,168 @@
+"""Incremental rolling-window aggregates (mean, min, max, trend) over live sensor readings."""
+
+from collections import deque
+from typing import Any
+
+from app.db import Reading
+
+
+class RollingWindow:
+    """
+    Time-based sliding window over one series with O(1) amortized work per sample.
+
+    Min and max come from monotonic deques; mean and least-squares trend come from running sums.
+    Timestamps in the sums are kept relative to an origin that is rebased every so often, which
+    also bounds the floating-point drift of the add/subtract updates.
+    """
+
+    REBUILD_AFTER_EVICTIONS = 4096
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+
+        self._samples: deque[tuple[int, int, float]] = deque()  # (seq, ts, value)
+        self._min: deque[tuple[int, float]] = deque()  # (seq, value), values increasing
+        self._max: deque[tuple[int, float]] = deque()  # (seq, value), values decreasing
+        self._seq = 0
+
+        self._origin = 0
+        self._evictions = 0
+        self._sum_t = 0
+        self._sum_tt = 0
+        self._sum_v = 0.0
+        self._sum_tv = 0.0
+
+
+    def add(self, ts: int, value: float) -> None:
+        if not self._samples:
+            self._rebuild_sums()  # clears residual drift from the previous run of samples
+            self._origin = ts
+
+        self._seq += 1
+        self._samples.append((self._seq, ts, value))
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((self._seq, value))
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self._seq, value))
+
+        t = ts - self._origin
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_v += value
+        self._sum_tv += t * value
+
+        self.evict(ts)
+
+
+    def evict(self, now: int) -> None:
+        """Drop samples that are `seconds` or more older than `now`."""
+        cutoff = now - self.seconds
+
+        while self._samples and self._samples[0][1] <= cutoff:
+            seq, ts, value = self._samples.popleft()
+            t = ts - self._origin
+            self._sum_t -= t
+            self._sum_tt -= t * t
+            self._sum_v -= value
+            self._sum_tv -= t * value
+            self._evictions += 1
+
+            if self._min[0][0] == seq:
+                self._min.popleft()
+            if self._max[0][0] == seq:
+                self._max.popleft()
+
+        if self._evictions >= max(self.REBUILD_AFTER_EVICTIONS, len(self._samples)):
+            self._rebuild_sums()
+
+
+    def snapshot(self) -> dict[str, Any] | None:
+        n = len(self._samples)
+        if n == 0:
+            return None
+
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        slope = (n * self._sum_tv - self._sum_t * self._sum_v) / denominator if denominator else 0.0
+
+        return {
+            "count": n,
+            "mean": self._sum_v / n,
+            "min": self._min[0][1],
+            "max": self._max[0][1],
+            "trend_per_min": slope * 60.0,
+            "first_ts": self._samples[0][1],
+            "last_ts": self._samples[-1][1],
+        }
+
+
+    def _rebuild_sums(self) -> None:
+        self._evictions = 0
+        self._origin = self._samples[0][1] if self._samples else 0
+        self._sum_t = self._sum_tt = 0
+        self._sum_v = self._sum_tv = 0.0
+
+        for _, ts, value in self._samples:
+            t = ts - self._origin
+            self._sum_t += t
+            self._sum_tt += t * t
+            self._sum_v += value
+            self._sum_tv += t * value
+
+
+class RollingAggregator:
+    """
+    Keeps one RollingWindow per (sensor, field, window length) and is fed from `on_reading_change`.
+    Readings are only emitted when they change beyond the sampler thresholds, so the aggregates
+    describe the emitted samples rather than a time-weighted signal.
+    """
+
+    FIELDS = ("temperature", "humidity")
+
+    def __init__(self, windows_seconds: list[int] | tuple[int, ...]):
+        self.windows_seconds = tuple(sorted(set(windows_seconds)))
+        self._windows: dict[str, dict[str, dict[int, RollingWindow]]] = {}
+
+
+    def add(self, reading: Reading) -> dict[str, Any]:
+        """Feed a reading and return the updated aggregates of its sensor."""
+        fields = self._windows.setdefault(reading.sensor, {})
+
+        for field in self.FIELDS:
+            value = getattr(reading, field)
+            if value is None:
+                continue
+
+            windows = fields.get(field)
+            if windows is None:
+                windows = fields[field] = {seconds: RollingWindow(seconds) for seconds in self.windows_seconds}
+
+            for window in windows.values():
+                window.add(reading.ts, value)
+
+        return self._sensor_snapshot(reading.sensor, now=reading.ts)
+
+
+    def clear(self) -> None:
+        """Forget all samples, e.g. before the windows are replayed from another process."""
+        self._windows.clear()
+
+
+    def snapshot(self, now: int, sensor: str | None = None) -> dict[str, dict[str, Any]]:
+        """Aggregates for all sensors (or one), after expiring samples older than each window at `now`."""
+        sensors = [sensor] if sensor is not None else list(self._windows)
+        return {name: self._sensor_snapshot(name, now=now) for name in sensors if name in self._windows}
+
+
+    def _sensor_snapshot(self, sensor: str, *, now: int) -> dict[str, Any]:
+        result: dict[str, Any] = {"sensor": sensor, "ts": now, "windows": {}}
+
+        for field, windows in self._windows[sensor].items():
+            for seconds, window in windows.items():
+                window.evict(now)
+                result["windows"].setdefault(f"{seconds}s", {})[field] = window.snapshot()
+
+        return result
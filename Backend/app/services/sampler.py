@@ -33,6 +33,7 @@ class Sampler:
         self.on_change = on_change
 
         self._last: Reading | None = None
+        self._last_error: str | None = None
         self._stop = asyncio.Event()
 
 
@@ -41,9 +42,14 @@ class Sampler:
         try:
             raw_sensor_data = await asyncio.to_thread(self.driver.read_sensor)
         except Exception as e:
-            print(f"Error reading sensor {self.sensor_name}: {e}")
+            # A missing sensor fails the same way every interval, only log when the error changes
+            if str(e) != self._last_error:
+                print(f"Error reading sensor {self.sensor_name}: {e}")
+            self._last_error = str(e)
             return
 
+        self._last_error = None
+
         if raw_sensor_data is None: return
 
         try:
@@ -0,0 +1,130 @@
+"""Vectorized per-sensor window statistics and derived humidity metrics, with a flush-invalidated cache."""
+
+from collections import OrderedDict
+from typing import Any, Final
+
+import numpy as np
+
+
+DEFAULT_PERCENTILES: Final[tuple[float, ...]] = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+# Magnus formula coefficients over water (Sonntag 1990), valid for roughly -45..60 °C.
+MAGNUS_A: Final = 17.62
+MAGNUS_B: Final = 243.12
+MAGNUS_E0_HPA: Final = 6.112
+
+# Molar mass of water / universal gas constant, in g·K/J; turns vapour pressure (Pa) into g/m³.
+WATER_VAPOUR_FACTOR: Final = 18.015 / 8.314
+
+
+def dew_point(temperature: np.ndarray, humidity: np.ndarray) -> np.ndarray:
+    """Dew point in °C from temperature (°C) and relative humidity (%)."""
+    gamma = np.log(humidity / 100.0) + MAGNUS_A * temperature / (MAGNUS_B + temperature)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def absolute_humidity(temperature: np.ndarray, humidity: np.ndarray) -> np.ndarray:
+    """Absolute humidity in g/m³ from temperature (°C) and relative humidity (%)."""
+    saturation_pa = MAGNUS_E0_HPA * 100.0 * np.exp(MAGNUS_A * temperature / (MAGNUS_B + temperature))
+    return WATER_VAPOUR_FACTOR * saturation_pa * (humidity / 100.0) / (temperature + 273.15)
+
+
+def window_stats(
+        rows: list[tuple[str, float, float | None, int]],
+        percentiles: tuple[float, ...] = DEFAULT_PERCENTILES) -> dict[str, dict[str, Any]]:
+    """
+    Summarize (sensor, temperature, humidity, ts) rows grouped by sensor and ordered by time.
+
+    :param rows: Rows as returned by `Database.rows_since` or `read_window`.
+    :param percentiles: Percentiles (0-100) to report for every series.
+    :return: Per-sensor statistics keyed by sensor name.
+    """
+    if not rows:
+        return {}
+
+    sensors, temperatures, humidities, timestamps = zip(*rows)
+    sensor_col = np.asarray(sensors)
+    temperature_col = np.asarray(temperatures, dtype=np.float64)
+    humidity_col = np.asarray(humidities, dtype=np.float64)  # NULL humidity becomes NaN
+    ts_col = np.asarray(timestamps, dtype=np.int64)
+
+    # Rows are sorted by sensor, so each sensor is one contiguous slice
+    breaks = np.flatnonzero(sensor_col[1:] != sensor_col[:-1]) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(sensor_col)]))
+
+    result: dict[str, dict[str, Any]] = {}
+    for lo, hi in zip(starts.tolist(), ends.tolist()):
+        temperature = temperature_col[lo:hi]
+        humidity = humidity_col[lo:hi]
+
+        summary: dict[str, Any] = {
+            "count": int(hi - lo),
+            "first_ts": int(ts_col[lo]),
+            "last_ts": int(ts_col[hi - 1]),
+            "temperature": _series_stats(temperature, percentiles),
+        }
+
+        paired = ~np.isnan(humidity) & ~np.isnan(temperature)
+        if paired.any():
+            t, rh = temperature[paired], humidity[paired]
+            summary["humidity"] = _series_stats(rh, percentiles)
+            summary["dew_point"] = _series_stats(dew_point(t, np.clip(rh, 0.1, 100.0)), percentiles)
+            summary["absolute_humidity"] = _series_stats(absolute_humidity(t, rh), percentiles)
+
+        result[str(sensor_col[lo])] = summary
+
+    return result
+
+
+def _series_stats(values: np.ndarray, percentiles: tuple[float, ...]) -> dict[str, Any]:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"count": 0}
+
+    stats: dict[str, Any] = {
+        "count": int(values.size),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+    }
+    if percentiles:
+        stats["percentiles"] = {
+            f"p{p:g}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))
+        }
+    return stats
+
+
+class StatsCache:
+    """
+    Small LRU cache of computed statistics. Entries are tagged with the database generation and
+    are served only while no new data has been flushed (or deleted) since they were computed, and
+    only for windows that start between the entry's own start and its oldest row: a later start
+    that would cut off rows the entry includes is a miss, even for a sensor that has gone quiet.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[int, int, int | None, dict]] = OrderedDict()
+
+    def get(self, key: tuple, generation: int, since_ts: int) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        entry_generation, entry_since_ts, oldest_ts, value = entry
+        if entry_generation != generation or since_ts < entry_since_ts:
+            return None
+        if oldest_ts is not None and since_ts > oldest_ts:
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, generation: int, since_ts: int, value: dict) -> None:
+        oldest_ts = min((summary["first_ts"] for summary in value.values()), default=None)
+        self._entries[key] = (generation, since_ts, oldest_ts, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
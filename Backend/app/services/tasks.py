@@ -1,18 +1,21 @@
 """Background tasks for periodic buffer flushing and retention cleanup in the database."""
 
 from collections import deque
+from typing import Callable
 import aiosqlite
 import asyncio
 import time
 
 from app.db import Database, Reading
+from app.services.archive import SECONDS_PER_DAY, ArchiveStore
 
 
 async def flusher(
         buffer: deque[Reading],
         db: Database,
         db_conn: aiosqlite.Connection,
-        interval_seconds: float) -> None:
+        interval_seconds: float,
+        on_flush: Callable[[], None] | None = None) -> None:
     """Periodically flush buffered readings to the database.
     
         Args:
@@ -20,6 +23,7 @@ async def flusher(
             db (Database): The database instance to insert readings into.
             db_conn (aiosqlite.Connection): The active database connection.
             interval_seconds (float): How often to flush the buffer in seconds.
+            on_flush (Callable[[], None] | None): Optional hook called after each successful flush.
     """
 
     while True:
@@ -32,6 +36,9 @@ async def flusher(
             buffer.clear()
             await db.insert_many(db_conn, batch)
 
+            if on_flush is not None:
+                on_flush()
+
         except asyncio.CancelledError:
             break
 
@@ -43,7 +50,10 @@ async def retention(
                     db: Database,
                     db_conn: aiosqlite.Connection,
                     interval_seconds: float = 3600.0,
-                    retention_hours: int = 24) -> None:
+                    retention_hours: int = 24,
+                    keep_after_id: Callable[[], int | None] | None = None,
+                    archive: ArchiveStore | None = None,
+                    on_delete: Callable[[], None] | None = None) -> None:
     """Periodically delete old readings from the database based on retention policy.
     
         Args:
@@ -51,16 +61,41 @@ async def retention(
             db_conn (aiosqlite.Connection): The active database connection.
             interval_seconds (float): How often to check for old readings in seconds.
             retention_hours (int): How many hours of data to retain in the database.
+            keep_after_id (Callable[[], int | None] | None): Optional provider of a row id after which
+                readings are kept regardless of age (e.g. not yet pushed by the uplink).
+            archive (ArchiveStore | None): Optional cold archive. Expired readings are written to it
+                before they are deleted, and only whole UTC days expire so each day file is written once.
+            on_delete (Callable[[], None] | None): Optional hook called after readings were deleted.
     """
     
     while True:
         try: 
             await asyncio.sleep(interval_seconds)
             cutoff = int(time.time()) - retention_hours * 3600
-            deleted_count = await db.delete_older_than(db_conn, cutoff_ts=cutoff)
+            max_id = keep_after_id() if keep_after_id is not None else None
+
+            if archive is None:
+                deleted_count = await db.delete_older_than(db_conn, cutoff_ts=cutoff, max_id=max_id)
+            else:
+                cutoff -= cutoff % SECONDS_PER_DAY
+                deleted_count = 0
+                # Rows archived by a run that stopped before its delete must not be archived twice
+                mark = await asyncio.to_thread(archive.archived_mark)
+                if mark is not None:
+                    deleted_count += await db.delete_older_than(db_conn, cutoff_ts=mark[0], max_id=mark[1])
+
+                expired = await db.rows_before(db_conn, cutoff_ts=cutoff, max_id=max_id)
+                if expired:
+                    # Bound the delete by the archived ids, rows that arrived meanwhile wait for the next run
+                    max_id = max(row[0] for row in expired)
+                    await asyncio.to_thread(
+                        archive.archive, [row[1:] for row in expired], cutoff_ts=cutoff, max_id=max_id)
+                    deleted_count += await db.delete_older_than(db_conn, cutoff_ts=cutoff, max_id=max_id)
 
             if deleted_count > 0:
                 print(f"Retention: deleted {deleted_count} old readings.")
+                if on_delete is not None:
+                    on_delete()
 
         except asyncio.CancelledError:
             break
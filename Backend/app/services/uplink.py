@@ -0,0 +1,194 @@
+"""Store-and-forward uplink that pushes flushed readings from an edge node to a central instance."""
+
+import asyncio
+import gzip
+import json
+import random
+import urllib.error
+import urllib.request
+from typing import Final
+
+import aiosqlite
+
+from app.db import Database
+from app.services.ingest import NDJSON_MEDIA_TYPE, SENSOR_NAME_PATTERN, encode_ndjson
+
+
+# 4xx replies that may succeed on a plain retry.
+TRANSIENT_CLIENT_ERRORS: Final = frozenset({408, 429})
+
+
+class UplinkRejected(RuntimeError):
+    """The central instance refused a batch; resending it unchanged will not help."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class Uplink:
+    """
+    Pushes readings stored after a persisted high-water mark (the last pushed row id) to
+    `<url>/api/ingest`. The batch sequence number is the id of the last row in the batch. That id
+    is persisted before the batch is sent, and until it is acknowledged a resend covers exactly
+    the same rows (never rows flushed meanwhile), so the central instance recognises it as a duplicate.
+    Row ids are only meaningful within one database, so every batch also carries the epoch
+    created together with this database's mark.
+    """
+
+    def __init__(
+        self,
+        *,
+        db: Database,
+        db_conn: aiosqlite.Connection,
+        url: str,
+        node_id: str,
+        batch_readings: int = 5_000,
+        timeout_seconds: float = 10.0,
+        backoff_initial_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+    ):
+        self.db = db
+        self.db_conn = db_conn
+        self.url = url.rstrip("/")
+        self.node_id = node_id
+        self.batch_readings = batch_readings
+        self.timeout_seconds = timeout_seconds
+        self.backoff_initial_seconds = backoff_initial_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self.high_water_mark: int | None = None
+        self.pending_id: int | None = None
+        self.epoch: str | None = None
+        # Set while the central instance rejects our batches; unpushed readings are pinned against retention meanwhile
+        self.error: str | None = None
+        self.rejected_batches = 0
+        self._wake = asyncio.Event()
+
+
+    def notify(self) -> None:
+        """Wake the uplink, called by the flusher after new readings were stored."""
+        self._wake.set()
+
+
+    async def run(self) -> None:
+        self.epoch, self.high_water_mark, self.pending_id = await self.db.get_uplink_mark(self.db_conn, target=self.url)
+        backoff = self.backoff_initial_seconds
+        self._wake.set()  # drain whatever is left over from the previous run
+
+        while True:
+            try:
+                await self._wake.wait()
+                self._wake.clear()
+
+                # Keep pushing full batches until the backlog is drained
+                while await self._push_once() >= self.batch_readings:
+                    pass
+                backoff = self.backoff_initial_seconds
+
+            except asyncio.CancelledError:
+                break
+
+            except UplinkRejected as e:
+                if e.status == 413 and self.batch_readings > 1:
+                    self.batch_readings = max(1, self.batch_readings // 2)
+                    print(f"Uplink: batch too large for {self.url} ({e}), continuing with {self.batch_readings} readings per batch")
+                    self._wake.set()
+                    continue
+
+                await self._set_error(str(e))
+                # Needs a fix on one side or the other, so only probe at the slowest rate
+                backoff = self.backoff_max_seconds
+                delay = backoff * random.uniform(0.5, 1.0)
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    break
+                self._wake.set()
+
+            except Exception as e:
+                delay = backoff * random.uniform(0.5, 1.0)  # jitter, so nodes do not retry in lockstep
+                print(f"Uplink error (retrying in {delay:.1f}s): {e}")
+                backoff = min(backoff * 2, self.backoff_max_seconds)
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    break
+                self._wake.set()
+
+
+    async def _push_once(self) -> int:
+        rows = await self.db.readings_after(
+            self.db_conn, after_id=self.high_water_mark, limit=self.batch_readings, max_id=self.pending_id)
+        if not rows:
+            return 0
+
+        # Readings relayed from other nodes are not forwarded again
+        payload_rows = [(s, t, h, ts) for (_, s, t, h, ts) in rows if SENSOR_NAME_PATTERN.match(s)]
+        seq = acked = rows[-1][0]
+
+        if payload_rows:
+            if self.pending_id is None:
+                await self.db.set_uplink_mark(self.db_conn, target=self.url, last_id=self.high_water_mark, pending_id=seq)
+                self.pending_id = seq
+            acked = await asyncio.to_thread(self._post, payload_rows, seq)
+
+        # A batch split after a 413 stays in flight until its last part is acknowledged
+        pending_id = self.pending_id if self.pending_id is not None and self.pending_id > acked else None
+        await self.db.set_uplink_mark(self.db_conn, target=self.url, last_id=acked, pending_id=pending_id)
+        if self.pending_id is not None and pending_id is None:
+            self._wake.set()  # readings flushed while the batch was in flight go right after it
+        self.high_water_mark, self.pending_id = acked, pending_id
+        if self.error is not None:
+            print(f"Uplink: {self.url} accepts batches again")
+            await self._set_error(None)
+        return len(rows)
+
+
+    async def _set_error(self, error: str | None) -> None:
+        if error is not None:
+            self.rejected_batches += 1
+            print(f"UPLINK STUCK: {self.url} rejected batch after id {self.high_water_mark}: {error}. "
+                  f"Unpushed readings are kept (retention cannot delete them) until this is fixed.")
+        if error != self.error:
+            self.error = error
+            try:
+                await self.db.set_uplink_error(self.db_conn, target=self.url, error=error)
+            except Exception as e:
+                print(f"Uplink: could not store error state: {e}")
+
+
+    def _post(self, rows: list[tuple], seq: int) -> int:
+        """Send one batch and return the sequence number the central instance has stored up to."""
+        # Runs in a worker thread: compression and network I/O stay off the event loop
+        request = urllib.request.Request(
+            f"{self.url}/api/ingest",
+            data=gzip.compress(encode_ndjson(rows)),
+            method="POST",
+            headers={
+                "Content-Type": NDJSON_MEDIA_TYPE,
+                "Content-Encoding": "gzip",
+                "X-Node-Id": self.node_id,
+                "X-Batch-Seq": str(seq),
+                "X-Node-Epoch": self.epoch,
+            },
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+                ack = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500 and e.code not in TRANSIENT_CLIENT_ERRORS:
+                detail = e.read(500).decode(errors="replace")
+                raise UplinkRejected(f"HTTP {e.code}: {detail}", status=e.code) from e
+            raise
+
+        acked = ack.get("seq", -1)
+        if ack.get("duplicate") and acked > seq:
+            if acked > self.pending_id:
+                # Same epoch but the receiver is already past this batch: our ids went backwards
+                raise UplinkRejected(f"Central instance already acknowledged seq {acked} for this epoch, batch {seq} was not stored")
+            # The whole batch in flight was stored by an earlier send, only its acknowledgement got lost
+            return acked
+        if acked < seq:
+            raise RuntimeError(f"Central instance did not acknowledge batch {seq}: {ack}")
+        return seq
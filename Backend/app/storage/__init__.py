@@ -0,0 +1,22 @@
+"""Pluggable reading storage backends behind `Database`, imported lazily by name."""
+
+import importlib
+from typing import Final
+
+from .base import IdRow, ReadingStore, Row
+from .rows import RowStore
+
+
+# Backend name -> "module:Class" of its store.
+STORAGE_BACKENDS: Final[dict[str, str]] = {
+    "rows": "app.storage.rows:RowStore",
+    "gorilla": "app.storage.blocks:BlockStore",
+}
+
+
+def create_store(name: str) -> ReadingStore:
+    module_name, _, class_name = STORAGE_BACKENDS[name].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+__all__ = ["IdRow", "ReadingStore", "Row", "RowStore", "STORAGE_BACKENDS", "create_store"]
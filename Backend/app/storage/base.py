@@ -0,0 +1,50 @@
+"""Storage interface the Database delegates reading persistence to."""
+
+from typing import Protocol, Sequence
+
+import aiosqlite
+
+
+# (sensor, temperature, humidity, ts)
+Row = tuple[str, float | None, float | None, int]
+# (id, sensor, temperature, humidity, ts); the id is monotonic in insert order
+IdRow = tuple[int, str, float | None, float | None, int]
+
+
+class ReadingStore(Protocol):
+    """
+    Persists readings on a shared aiosqlite connection. Implementations never commit; the
+    Database wraps calls in its own transactions.
+    """
+
+    # Backend name (key in STORAGE_BACKENDS); ids of different backends are unrelated
+    name: str
+
+    async def setup(self, db: aiosqlite.Connection) -> None: ...
+
+    async def insert_many(self, db: aiosqlite.Connection, rows: list[Row]) -> None: ...
+
+    async def range_query(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            since_ts: int,
+            sensor: str | None = None,
+            exclude: Sequence[tuple[int, int]] = ()) -> list[Row]:
+        """
+        Rows with ts >= since_ts, grouped by sensor and ordered by time within each sensor, leaving
+        out rows with ts < cutoff_ts and id <= max_id for every (cutoff_ts, max_id) in `exclude`.
+        """
+        ...
+
+    async def rows_before(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int) -> list[IdRow]:
+        """Rows with ts < cutoff_ts and id <= max_id, grouped by sensor and ordered by time."""
+        ...
+
+    async def delete_before(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int) -> int:
+        """Delete the rows `rows_before` returns for the same arguments; return how many were deleted."""
+        ...
+
+    async def rows_after(self, db: aiosqlite.Connection, *, after_id: int, limit: int, max_id: int) -> list[IdRow]:
+        """At least the first `limit` rows with after_id < id <= max_id (or all of them), in insert order."""
+        ...
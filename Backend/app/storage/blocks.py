@@ -0,0 +1,160 @@
+"""Compressed block storage backend: per-sensor Gorilla-encoded blocks kept in SQLite BLOBs."""
+
+import asyncio
+from itertools import groupby
+from typing import Sequence
+
+import aiosqlite
+
+from app.storage.base import IdRow, Row
+from app.storage.gorilla import decode_block, encode_block
+
+
+class BlockStore:
+    """
+    Every insert stores one immutable block per sensor (split at `max_block_points`), so a flush
+    costs one SQLite row per sensor instead of one per reading. Block ids play the role of row ids:
+    all points of a block share its id. Retention drops whole blocks and re-encodes the one block
+    per sensor that straddles the cutoff, keeping its id.
+    """
+
+    name = "gorilla"
+
+    def __init__(self, max_block_points: int = 1024):
+        self.max_block_points = max_block_points
+
+    async def setup(self, db: aiosqlite.Connection) -> None:
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reading_blocks (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              sensor TEXT NOT NULL,
+              start_ts INTEGER NOT NULL,
+              end_ts INTEGER NOT NULL,
+              count INTEGER NOT NULL,
+              data BLOB NOT NULL
+            );
+            """
+        )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_blocks_sensor_end ON reading_blocks(sensor, end_ts);")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_blocks_end ON reading_blocks(end_ts);")
+
+    async def insert_many(self, db: aiosqlite.Connection, rows: list[Row]) -> None:
+        blocks = await asyncio.to_thread(self._encode_rows, rows)
+        await db.executemany(
+            "INSERT INTO reading_blocks(sensor, start_ts, end_ts, count, data) VALUES(?, ?, ?, ?, ?);",
+            blocks,
+        )
+
+    async def range_query(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            since_ts: int,
+            sensor: str | None = None,
+            exclude: Sequence[tuple[int, int]] = ()) -> list[Row]:
+        params: tuple = (since_ts,)
+        sensor_filter = ""
+        if sensor is not None:
+            params += (sensor,)
+            sensor_filter = "AND sensor = ?"
+
+        cursor = await db.execute(
+            f"""
+            SELECT id, sensor, data
+            FROM reading_blocks
+            WHERE end_ts >= ? {sensor_filter}
+            ORDER BY sensor ASC, start_ts ASC;
+            """,
+            params,
+        )
+        blocks = await cursor.fetchall()
+        def keep(block_id: int, ts: int) -> bool:
+            return ts >= since_ts and not any(ts < cutoff_ts and block_id <= max_id for cutoff_ts, max_id in exclude)
+
+        rows = await asyncio.to_thread(self._decode_blocks, blocks, keep)
+        return [row[1:] for row in rows]
+
+    async def rows_before(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int) -> list[IdRow]:
+        cursor = await db.execute(
+            """
+            SELECT id, sensor, data
+            FROM reading_blocks
+            WHERE start_ts < ? AND id <= ?
+            ORDER BY sensor ASC, start_ts ASC;
+            """,
+            (cutoff_ts, max_id),
+        )
+        blocks = await cursor.fetchall()
+        return await asyncio.to_thread(self._decode_blocks, blocks, lambda block_id, ts: ts < cutoff_ts)
+
+    async def delete_before(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int) -> int:
+        cursor = await db.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM reading_blocks WHERE end_ts < ? AND id <= ?;",
+            (cutoff_ts, max_id),
+        )
+        (deleted,) = await cursor.fetchone()
+        await db.execute("DELETE FROM reading_blocks WHERE end_ts < ? AND id <= ?;", (cutoff_ts, max_id))
+
+        cursor = await db.execute(
+            "SELECT id, data FROM reading_blocks WHERE start_ts < ? AND end_ts >= ? AND id <= ?;",
+            (cutoff_ts, cutoff_ts, max_id),
+        )
+        for block_id, data in await cursor.fetchall():
+            timestamps, temperatures, humidities = decode_block(data)
+            keep = next(i for i, ts in enumerate(timestamps) if ts >= cutoff_ts)
+            await db.execute(
+                "UPDATE reading_blocks SET start_ts = ?, count = ?, data = ? WHERE id = ?;",
+                (
+                    timestamps[keep],
+                    len(timestamps) - keep,
+                    encode_block(timestamps[keep:], temperatures[keep:], humidities[keep:]),
+                    block_id,
+                ),
+            )
+            deleted += keep
+
+        return deleted
+
+    async def rows_after(self, db: aiosqlite.Connection, *, after_id: int, limit: int, max_id: int) -> list[IdRow]:
+        cursor = await db.execute(
+            "SELECT id, sensor, data, count FROM reading_blocks WHERE id > ? AND id <= ? ORDER BY id ASC;",
+            (after_id, max_id),
+        )
+
+        blocks, total = [], 0
+        while total < limit and (batch := await cursor.fetchmany(64)):
+            for block_id, sensor, data, count in batch:
+                blocks.append((block_id, sensor, data))
+                total += count
+                if total >= limit:
+                    break
+        await cursor.close()
+
+        return await asyncio.to_thread(self._decode_blocks, blocks, lambda block_id, ts: True, False)
+
+    def _encode_rows(self, rows: list[Row]) -> list[tuple[str, int, int, int, bytes]]:
+        blocks = []
+        for sensor, group in groupby(sorted(rows, key=lambda row: (row[0], row[3])), key=lambda row: row[0]):
+            points = list(group)
+            for start in range(0, len(points), self.max_block_points):
+                chunk = points[start:start + self.max_block_points]
+                timestamps = [row[3] for row in chunk]
+                data = encode_block(timestamps, [row[1] for row in chunk], [row[2] for row in chunk])
+                blocks.append((sensor, timestamps[0], timestamps[-1], len(chunk), data))
+        return blocks
+
+    @staticmethod
+    def _decode_blocks(blocks: list[tuple[int, str, bytes]], keep, by_sensor: bool = True) -> list[IdRow]:
+        rows: list[IdRow] = []
+        for block_id, sensor, data in blocks:
+            timestamps, temperatures, humidities = decode_block(data)
+            rows.extend(
+                (block_id, sensor, t, h, ts)
+                for ts, t, h in zip(timestamps, temperatures, humidities)
+                if keep(block_id, ts)
+            )
+        if by_sensor:
+            # Blocks of one sensor may overlap in time (late ingested data), restore the time order
+            rows.sort(key=lambda row: (row[1], row[4]))
+        return rows
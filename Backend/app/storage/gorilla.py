@@ -0,0 +1,217 @@
+"""Gorilla-style block codec: delta-of-delta timestamps and XOR-compressed float values."""
+
+import math
+import struct
+from typing import Final
+
+import numpy as np
+
+
+# Block header: point count, first timestamp, humidity mode.
+BLOCK_HEADER: Final = struct.Struct("<IqB")
+
+HUMIDITY_NONE: Final = 0  # no point has humidity
+HUMIDITY_ALL: Final = 1  # every point has humidity
+HUMIDITY_MIXED: Final = 2  # presence bitmap follows the header
+
+MASK_64: Final = (1 << 64) - 1
+
+
+class BitWriter:
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, bits: int) -> None:
+        self._acc = (self._acc << bits) | value
+        self._bits += bits
+        if self._bits >= 64:
+            self._drain()
+
+    def getvalue(self) -> bytes:
+        self._drain()
+        if self._bits:
+            self._buf.append((self._acc << (8 - self._bits)) & 0xFF)
+            self._acc = self._bits = 0
+        return bytes(self._buf)
+
+    def _drain(self) -> None:
+        whole = self._bits // 8
+        if whole:
+            rest = self._bits - whole * 8
+            self._buf += (self._acc >> rest).to_bytes(whole, "big")
+            self._acc &= (1 << rest) - 1
+            self._bits = rest
+
+
+class BitReader:
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self._data = data
+        self._pos = offset * 8
+
+    def read(self, bits: int) -> int:
+        start = self._pos >> 3
+        end = (self._pos + bits + 7) >> 3
+        chunk = int.from_bytes(self._data[start:end], "big")
+        self._pos += bits
+        return (chunk >> (end * 8 - self._pos)) & ((1 << bits) - 1)
+
+
+def _write_dod(writer: BitWriter, dod: int) -> None:
+    if dod == 0:
+        writer.write(0b0, 1)
+    elif -63 <= dod <= 64:
+        writer.write(0b10, 2)
+        writer.write(dod + 63, 7)
+    elif -255 <= dod <= 256:
+        writer.write(0b110, 3)
+        writer.write(dod + 255, 9)
+    elif -2047 <= dod <= 2048:
+        writer.write(0b1110, 4)
+        writer.write(dod + 2047, 12)
+    else:
+        writer.write(0b1111, 4)
+        writer.write(dod & MASK_64, 64)
+
+
+def _read_dod(reader: BitReader) -> int:
+    if not reader.read(1):
+        return 0
+    if not reader.read(1):
+        return reader.read(7) - 63
+    if not reader.read(1):
+        return reader.read(9) - 255
+    if not reader.read(1):
+        return reader.read(12) - 2047
+    value = reader.read(64)
+    return value - (1 << 64) if value >> 63 else value
+
+
+class _XorState:
+    __slots__ = ("prev", "lead", "trail")
+
+    def __init__(self, first: int) -> None:
+        self.prev = first
+        self.lead = -1
+        self.trail = 0
+
+
+def _write_xor(writer: BitWriter, state: _XorState, bits: int) -> None:
+    xor = bits ^ state.prev
+    state.prev = bits
+    if xor == 0:
+        writer.write(0b0, 1)
+        return
+
+    lead = min(64 - xor.bit_length(), 31)
+    trail = (xor & -xor).bit_length() - 1
+
+    if state.lead >= 0 and lead >= state.lead and trail >= state.trail:
+        # Meaningful bits fit in the previous window: reuse it
+        writer.write(0b10, 2)
+        writer.write(xor >> state.trail, 64 - state.lead - state.trail)
+    else:
+        significant = 64 - lead - trail
+        writer.write(0b11, 2)
+        writer.write(lead, 5)
+        writer.write(significant - 1, 6)
+        writer.write(xor >> trail, significant)
+        state.lead, state.trail = lead, trail
+
+
+def _read_xor(reader: BitReader, state: _XorState) -> int:
+    if reader.read(1):
+        if reader.read(1):
+            state.lead = reader.read(5)
+            significant = reader.read(6) + 1
+            state.trail = 64 - state.lead - significant
+        else:
+            significant = 64 - state.lead - state.trail
+        state.prev ^= reader.read(significant) << state.trail
+    return state.prev
+
+
+def _float_bits(values: list[float]) -> list[int]:
+    return np.asarray(values, dtype=np.float64).view(np.uint64).tolist()
+
+
+def _bits_float(bits: list[int]) -> list[float]:
+    return np.asarray(bits, dtype=np.uint64).view(np.float64).tolist()
+
+
+def encode_block(timestamps: list[int], temperatures: list[float | None], humidities: list[float | None]) -> bytes:
+    """Encode one sensor's points (ordered by time) into a self-contained block."""
+    count = len(timestamps)
+    present = [h is not None for h in humidities]
+    mode = HUMIDITY_ALL if all(present) else HUMIDITY_NONE if not any(present) else HUMIDITY_MIXED
+
+    temperature_bits = _float_bits([math.nan if t is None else t for t in temperatures])
+    humidity_bits = _float_bits([h for h in humidities if h is not None])
+
+    writer = BitWriter()
+    writer.write(temperature_bits[0], 64)
+    temperature_state = _XorState(temperature_bits[0])
+
+    humidity_iter = iter(humidity_bits)
+    humidity_state: _XorState | None = None
+
+    prev_ts, prev_delta = timestamps[0], 0
+    for i in range(count):
+        if i:
+            delta = timestamps[i] - prev_ts
+            _write_dod(writer, delta - prev_delta)
+            prev_ts, prev_delta = timestamps[i], delta
+            _write_xor(writer, temperature_state, temperature_bits[i])
+
+        if present[i]:
+            bits = next(humidity_iter)
+            if humidity_state is None:
+                writer.write(bits, 64)
+                humidity_state = _XorState(bits)
+            else:
+                _write_xor(writer, humidity_state, bits)
+
+    bitmap = np.packbits(present).tobytes() if mode == HUMIDITY_MIXED else b""
+    return BLOCK_HEADER.pack(count, timestamps[0], mode) + bitmap + writer.getvalue()
+
+
+def decode_block(data: bytes) -> tuple[list[int], list[float | None], list[float | None]]:
+    """Inverse of `encode_block`: (timestamps, temperatures, humidities)."""
+    count, first_ts, mode = BLOCK_HEADER.unpack_from(data, 0)
+    offset = BLOCK_HEADER.size
+
+    if mode == HUMIDITY_MIXED:
+        bitmap_size = (count + 7) // 8
+        present = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=bitmap_size, offset=offset), count=count)
+        present = present.astype(bool).tolist()
+        offset += bitmap_size
+    else:
+        present = [mode == HUMIDITY_ALL] * count
+
+    reader = BitReader(data, offset)
+    timestamps = [first_ts]
+    temperature_bits = [reader.read(64)]
+    temperature_state = _XorState(temperature_bits[0])
+    humidity_bits: list[int] = []
+    humidity_state: _XorState | None = None
+
+    prev_ts, prev_delta = first_ts, 0
+    for i in range(count):
+        if i:
+            prev_delta += _read_dod(reader)
+            prev_ts += prev_delta
+            timestamps.append(prev_ts)
+            temperature_bits.append(_read_xor(reader, temperature_state))
+
+        if present[i]:
+            if humidity_state is None:
+                humidity_state = _XorState(reader.read(64))
+                humidity_bits.append(humidity_state.prev)
+            else:
+                humidity_bits.append(_read_xor(reader, humidity_state))
+
+    temperatures = [None if math.isnan(t) else t for t in _bits_float(temperature_bits)]
+    humidity_values = iter(_bits_float(humidity_bits))
+    humidities = [next(humidity_values) if p else None for p in present]
+    return timestamps, temperatures, humidities
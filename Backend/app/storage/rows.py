@@ -0,0 +1,88 @@
+"""Row-per-reading storage backend (the original `readings` table)."""
+
+import aiosqlite
+
+from typing import Sequence
+
+from app.storage.base import IdRow, Row
+
+
+class RowStore:
+    name = "rows"
+
+    async def setup(self, db: aiosqlite.Connection) -> None:
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS readings (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              sensor TEXT NOT NULL,
+              temperature REAL,
+              humidity REAL,
+              ts INTEGER NOT NULL
+            );
+            """
+        )
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_readings_ts ON readings(ts);")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_readings_sensor_ts ON readings(sensor, ts);")
+
+    async def insert_many(self, db: aiosqlite.Connection, rows: list[Row]) -> None:
+        await db.executemany(
+            "INSERT INTO readings(sensor, temperature, humidity, ts) VALUES(?, ?, ?, ?);",
+            rows,
+        )
+
+    async def range_query(
+            self,
+            db: aiosqlite.Connection,
+            *,
+            since_ts: int,
+            sensor: str | None = None,
+            exclude: Sequence[tuple[int, int]] = ()) -> list[Row]:
+        params: tuple = (since_ts,)
+        filters = ""
+        if sensor is not None:
+            params += (sensor,)
+            filters = "AND sensor = ?"
+        for cutoff_ts, max_id in exclude:
+            params += (cutoff_ts, max_id)
+            filters += " AND NOT (ts < ? AND id <= ?)"
+
+        cursor = await db.execute(
+            f"""
+            SELECT sensor, temperature, humidity, ts
+            FROM readings
+            WHERE ts >= ? {filters}
+            ORDER BY sensor ASC, ts ASC;
+            """,
+            params,
+        )
+        return list(await cursor.fetchall())
+
+    async def rows_before(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int) -> list[IdRow]:
+        cursor = await db.execute(
+            """
+            SELECT id, sensor, temperature, humidity, ts
+            FROM readings
+            WHERE ts < ? AND id <= ?
+            ORDER BY sensor ASC, ts ASC;
+            """,
+            (cutoff_ts, max_id),
+        )
+        return list(await cursor.fetchall())
+
+    async def delete_before(self, db: aiosqlite.Connection, *, cutoff_ts: int, max_id: int) -> int:
+        cursor = await db.execute("DELETE FROM readings WHERE ts < ? AND id <= ?;", (cutoff_ts, max_id))
+        return cursor.rowcount
+
+    async def rows_after(self, db: aiosqlite.Connection, *, after_id: int, limit: int, max_id: int) -> list[IdRow]:
+        cursor = await db.execute(
+            """
+            SELECT id, sensor, temperature, humidity, ts
+            FROM readings
+            WHERE id > ? AND id <= ?
+            ORDER BY id ASC
+            LIMIT ?;
+            """,
+            (after_id, max_id, limit),
+        )
+        return list(await cursor.fetchall())
@@ -0,0 +1,92 @@
+"""Compare the storage backends: bytes per point, insert throughput and range-scan speed.
+
+Run from `Backend/`:  python scripts/bench_storage.py [--points 200000] [--batch 300]
+
+Synthetic data mimics the real sensors: a DS18B20 random walk in 1/16 °C steps and an AM2302
+with 0.1 °C / 0.1 %RH steps, sampled every 2 seconds and flushed in batches like the flusher does.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db import Database, Reading  # noqa: E402
+from app.storage import STORAGE_BACKENDS, create_store  # noqa: E402
+
+
+def synthetic_readings(points: int, start_ts: int) -> list[Reading]:
+    rng = random.Random(42)
+    readings: list[Reading] = []
+    ds_temp, am_temp, am_hum = 21000, 215, 455  # millidegrees, tenths, tenths
+
+    for i in range(points // 2):
+        ts = start_ts + 2 * i
+        ds_temp += rng.choice((-62, 0, 0, 0, 63))
+        am_temp += rng.choice((-1, 0, 0, 0, 1))
+        am_hum += rng.choice((-1, 0, 0, 1))
+        readings.append(Reading(sensor="ds18b20", temperature=ds_temp / 1000.0, ts=ts))
+        readings.append(Reading(sensor="am2302", temperature=am_temp / 10.0 - 1.0, humidity=am_hum / 10.0, ts=ts))
+
+    return readings
+
+
+async def bench_backend(name: str, readings: list[Reading], batch: int, directory: str) -> dict[str, float]:
+    db = Database(os.path.join(directory, f"{name}.db"), storage=create_store(name))
+    conn = await db.connect()
+
+    t0 = time.perf_counter()
+    for start in range(0, len(readings), batch):
+        await db.insert_many(conn, readings[start:start + batch])
+    insert_seconds = time.perf_counter() - t0
+
+    await conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    cursor = await conn.execute(
+        "SELECT page_count * page_size, freelist_count * page_size FROM pragma_page_count(), pragma_page_size(), pragma_freelist_count();"
+    )
+    total_bytes, free_bytes = await cursor.fetchone()
+
+    first_ts, last_ts = readings[0].ts, readings[-1].ts
+    scans = {}
+    for label, since_ts in (("full", first_ts), ("last_1h", last_ts - 3600)):
+        t0 = time.perf_counter()
+        rows = await db.rows_since(conn, since_ts=since_ts)
+        scans[label] = (time.perf_counter() - t0, len(rows))
+
+    await conn.close()
+
+    return {
+        "bytes_per_point": (total_bytes - free_bytes) / len(readings),
+        "insert_points_per_s": len(readings) / insert_seconds,
+        "scan_full_s": scans["full"][0],
+        "scan_full_points_per_s": scans["full"][1] / scans["full"][0],
+        "scan_1h_ms": scans["last_1h"][0] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=200_000, help="Total readings to store")
+    parser.add_argument("--batch", type=int, default=300, help="Readings per flush")
+    args = parser.parse_args()
+
+    readings = synthetic_readings(args.points, start_ts=int(time.time()) - args.points)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {name: await bench_backend(name, readings, args.batch, directory) for name in STORAGE_BACKENDS}
+
+    metrics = ["bytes_per_point", "insert_points_per_s", "scan_full_s", "scan_full_points_per_s", "scan_1h_ms"]
+    print(f"{len(readings)} points, flush batch {args.batch}")
+    print(f"{'metric':<24}" + "".join(f"{name:>14}" for name in results))
+    for metric in metrics:
+        print(f"{metric:<24}" + "".join(f"{results[name][metric]:>14.3f}" for name in results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Measure import and startup time of the backend and fail if either exceeds its budget.
+
+Run from `Backend/`:  python scripts/check_startup_budget.py [--import-budget 1.5] [--startup-budget 1.0]
+
+Each measurement runs in a fresh interpreter. Startup uses a throwaway DB, so it also checks that
+the service comes up (with sensors reported as not ready) on a machine without the hardware.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that probe GPIO / board hardware when imported.
+HARDWARE_MODULES = ("adafruit_dht", "board", "digitalio", "RPi")
+
+IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+hardware = sorted(m for m in sys.modules if m.split(".")[0] in {hardware!r})
+print(json.dumps({{"seconds": elapsed, "hardware": hardware}}))
+"""
+
+STARTUP_PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter() - t0
+        await app.state.db_conn.execute("SELECT 1;")
+    print(json.dumps({"seconds": ready}))
+
+asyncio.run(main())
+"""
+
+
+def run_probe(code: str, env: dict[str, str]) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"Probe failed:\n{completed.stdout}\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--import-budget", type=float, default=1.5, help="Seconds allowed for `import app.main`")
+    parser.add_argument("--startup-budget", type=float, default=1.0, help="Seconds allowed from interpreter start until the lifespan is up (includes import)")
+    args = parser.parse_args()
+
+    failures: list[str] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DB_PATH": os.path.join(tmp, "airmetrics.db"), "PYTHONDONTWRITEBYTECODE": "1"}
+
+        # Tooling that only needs the storage layer must not pull in the web stack or hardware
+        db_import = run_probe(IMPORT_PROBE.format(module="app.db", hardware=HARDWARE_MODULES), env)
+        print(f"import app.db:   {db_import['seconds']:.3f}s")
+        if db_import["hardware"]:
+            failures.append(f"app.db imports hardware modules: {db_import['hardware']}")
+
+        main_import = run_probe(IMPORT_PROBE.format(module="app.main", hardware=HARDWARE_MODULES), env)
+        print(f"import app.main: {main_import['seconds']:.3f}s (budget {args.import_budget:.3f}s)")
+        if main_import["hardware"]:
+            failures.append(f"app.main imports hardware modules at import time: {main_import['hardware']}")
+        if main_import["seconds"] > args.import_budget:
+            failures.append(f"import app.main took {main_import['seconds']:.3f}s")
+
+        startup = run_probe(STARTUP_PROBE, env)
+        print(f"startup:         {startup['seconds']:.3f}s (budget {args.startup_budget:.3f}s)")
+        if startup["seconds"] > args.startup_budget:
+            failures.append(f"startup took {startup['seconds']:.3f}s")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())